@@ -0,0 +1,61 @@
+"""
+Build the precomputed risk lookup table for the current models.
+Run this script after training (train_all_models.py). model_utils picks the
+table up automatically and falls back to the forests for inputs outside it.
+"""
+
+import os
+import time
+
+import numpy as np
+
+import model_utils
+from lookup_table import LOOKUP_AXES, RiskLookupTable, build_table, DATA_FILENAME, HEADER_FILENAME
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+print("=" * 70)
+print("Building Risk Lookup Table")
+print("=" * 70)
+
+# Load models ------------------------------------------------------------------------------
+print("\n[1/3] Loading models...")
+models = model_utils.load_models(engine='compiled')
+print(f"   ✓ Model version: {models['version']}")
+
+n_cells = int(np.prod([high - low + 1 for _, low, high in LOOKUP_AXES]))
+print(f"   ✓ Grid: {n_cells:,} cells")
+for name, low, high in LOOKUP_AXES:
+    print(f"      - {name}: {low}-{high}")
+
+# Score every cell -------------------------------------------------------------------------
+print("\n[2/3] Scoring every cell with both models...")
+start = time.perf_counter()
+header = build_table(
+    models['depression_model'], models['suicidal_model'],
+    models['version'], script_dir
+)
+print(f"   ✓ Done in {time.perf_counter() - start:.1f}s")
+
+# Check a sample against the forests -------------------------------------------------------
+print("\n[3/3] Checking a random sample against the forests...")
+rng = np.random.default_rng(0)
+sample = np.stack([
+    rng.integers(low, high + 1, 1000) for _, low, high in LOOKUP_AXES
+], axis=1).astype(np.float64)
+
+table = RiskLookupTable.load(script_dir, models['version'])
+_, table_probs = table.lookup(sample)
+max_deviation = 0.0
+for column, name in enumerate(['depression_model', 'suicidal_model']):
+    forest_probs = models[name].predict_proba(sample)[:, 1]
+    max_deviation = max(max_deviation, float(np.abs(table_probs[:, column] - forest_probs).max()))
+print(f"   ✓ Max probability deviation: {max_deviation:.2e}")
+
+size_mb = os.path.getsize(os.path.join(script_dir, DATA_FILENAME)) / 1e6
+print("\n" + "=" * 70)
+print(f"✓ Lookup table saved ({size_mb:.1f} MB)")
+print("=" * 70)
+print("\nGenerated files:")
+print(f"  • {HEADER_FILENAME}")
+print(f"  • {DATA_FILENAME}")
@@ -0,0 +1,158 @@
+"""
+Precomputed cohort statistics over the student dataset.
+
+Per-feature means and sorted value arrays are computed once from the dataset
+CSV and stored in cohort_stats.json, keyed on the CSV's sha256. Each lookup
+afterwards is a binary search (np.searchsorted), so requests never touch the
+CSV. get_cohort_stats() notices when the CSV changes (size or mtime) and
+rebuilds the statistics if its content is different.
+
+Values are on the web app scale: the Streamlit app rates sleep and diet from
+1 to 5, while the dataset encodes them as 1-4 and 1-3 (APP_SCALES).
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+STATS_FILENAME = 'cohort_stats.json'
+STATS_FORMAT = 'cohort-stats-v1'
+
+# App field -> dataset column
+COHORT_FEATURES = {
+    'age': 'Age',
+    'academic_pressure': 'Academic Pressure',
+    'study_satisfaction': 'Study Satisfaction',
+    'study_hours': 'Study Hours',
+    'financial_stress': 'Financial Stress',
+    'sleep_quality': 'Sleep Duration',
+    'diet_quality': 'Dietary Habits'
+}
+
+# Dataset code -> app value, for the fields the app shows on another scale
+# (same mapping as the sleep_map/diet_map of the Streamlit survey)
+APP_SCALES = {
+    'sleep_quality': {1: 1, 2: 2, 3: 4, 4: 5},
+    'diet_quality': {1: 1, 2: 3, 3: 5}
+}
+
+
+class CohortStats:
+    """
+    Means and sorted values of each COHORT_FEATURES field.
+    """
+
+    def __init__(self, features, dataset_sha256):
+        self.dataset_sha256 = dataset_sha256
+        self.sorted_values = {name: np.asarray(values, dtype=np.float64) for name, values in features.items()}
+        self.means = {name: float(values.mean()) for name, values in self.sorted_values.items()}
+
+    @classmethod
+    def from_csv(cls, path):
+        from dataset import file_sha256, load_encoded_dataset
+
+        df = load_encoded_dataset(path)
+        features = {}
+        for name, column in COHORT_FEATURES.items():
+            values = df[column].dropna()
+            if name in APP_SCALES:
+                values = values.map(APP_SCALES[name]).dropna()
+            features[name] = np.sort(values.to_numpy(dtype=np.float64))
+        return cls(features, file_sha256(path))
+
+    def save(self, path, dataset_stat=None):
+        header = {
+            'format': STATS_FORMAT,
+            'dataset_sha256': self.dataset_sha256,
+            'dataset_stat': dataset_stat,
+            'features': {name: values.tolist() for name, values in self.sorted_values.items()}
+        }
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(header, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns:
+            tuple: (CohortStats, stored dataset (size, mtime)), or None if the
+            file is missing or in another format
+        """
+        try:
+            with open(path) as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if header.get('format') != STATS_FORMAT:
+            return None
+        stats = cls(header['features'], header['dataset_sha256'])
+        stat = header.get('dataset_stat')
+        return stats, tuple(stat) if stat else None
+
+    def mean(self, name):
+        return self.means[name]
+
+    def percentile(self, name, value):
+        """
+        Percentile rank of a value within the cohort (0-100): the share of
+        students below it, counting ties as half.
+        """
+        values = self.sorted_values[name]
+        below = np.searchsorted(values, value, side='left')
+        not_above = np.searchsorted(values, value, side='right')
+        return float((below + not_above) / 2 / len(values) * 100)
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _dataset_stat(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def get_cohort_stats(path=None, stats_path=None):
+    """
+    Cohort statistics of the dataset, built on first use and rebuilt when the
+    CSV changes. Repeated calls cost one os.stat of the CSV.
+
+    Args:
+        path: dataset CSV, defaults to configs.data_dir
+        stats_path: where the statistics are stored, defaults to
+                    cohort_stats.json next to this module
+    """
+    if path is None:
+        from dataset import DEFAULT_DATA_PATH
+        path = DEFAULT_DATA_PATH
+    stats_path = stats_path or os.path.join(script_dir, STATS_FILENAME)
+    dataset_stat = _dataset_stat(path)
+
+    with _lock:
+        cached = _cache.get((path, stats_path))
+        if cached is not None and cached[1] == dataset_stat:
+            return cached[0]
+
+        stats = None
+        loaded = CohortStats.load(stats_path)
+        if loaded is not None:
+            from dataset import file_sha256
+
+            stored, stored_stat = loaded
+            # Same size and mtime: trust the stored hash, otherwise re-hash
+            if stored_stat == dataset_stat or stored.dataset_sha256 == file_sha256(path):
+                stats = stored
+                if stored_stat != dataset_stat:
+                    stats.save(stats_path, dataset_stat)
+
+        if stats is None:
+            stats = CohortStats.from_csv(path)
+            stats.save(stats_path, dataset_stat)
+
+        _cache[(path, stats_path)] = (stats, dataset_stat)
+        return stats
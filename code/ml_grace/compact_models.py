@@ -0,0 +1,128 @@
+"""
+Compact the trained forests into smaller memory-mappable artifacts.
+
+Every model pickle is flattened (CompiledForest) and rewritten as a
+CompactForest in <model>.compact/: uint8 feature ids, float32 thresholds,
+uint32 node ids, leaf distributions quantized to --leaf-bits and identical
+subtrees stored once. Serve them with load_models(engine='compact').
+
+The report lists the bytes of the pickle, of the flat .forest arrays and of
+the compact arrays, and the largest probability change vs. the original
+forest over the dataset rows, a sample of the lookup grid, random
+fractional answers and answers with missing (NaN) fields. The original is evaluated with CompiledForest, which
+reproduces sklearn's predict_proba bit for bit.
+
+Usage:
+    python compact_models.py [--leaf-bits 16|8] [--check-rows 5000]
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+
+import numpy as np
+
+from dataset import load_encoded_dataset
+from forest_engine import CompiledForest, CompactForest, nbytes
+from lookup_table import LOOKUP_AXES
+from model_utils import FEATURE_COLUMNS
+from training import MODEL_SPECS, MULTI_OUTPUT_SPEC
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def check_inputs(n_rows, seed=0):
+    """
+    Dataset rows, random grid cells, random fractional answers and grid
+    cells with missing answers (NaN, as encode_row gives for None), float32.
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.stack([rng.integers(low, high + 1, n_rows) for _, low, high in LOOKUP_AXES], axis=1)
+    fractional = np.stack([rng.uniform(low - 1, high + 1, n_rows) for _, low, high in LOOKUP_AXES], axis=1)
+    missing = np.where(rng.random(grid.shape) < 0.2, np.nan, grid)
+    dataset = load_encoded_dataset()[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    return np.concatenate([dataset, grid, fractional, missing]).astype(np.float32)
+
+
+def deviation(forest, compact, X):
+    """
+    Returns:
+        tuple: (max absolute probability change, share of identical labels)
+    """
+    expected, actual = forest.predict_proba(X), compact.predict_proba(X)
+    if not isinstance(expected, list):
+        expected, actual = [expected], [actual]
+    max_deviation = max(float(np.abs(e - a).max()) for e, a in zip(expected, actual))
+    same_label = np.mean([np.argmax(e, axis=1) == np.argmax(a, axis=1) for e, a in zip(expected, actual)])
+    return max_deviation, float(same_label)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--leaf-bits', type=int, choices=[8, 16], default=16,
+                        help='bits per quantized leaf probability')
+    parser.add_argument('--check-rows', type=int, default=5000,
+                        help='random grid and fractional rows compared with the original forest')
+    args = parser.parse_args()
+
+    specs = [spec for spec in list(MODEL_SPECS.values()) + [MULTI_OUTPUT_SPEC]
+             if os.path.exists(os.path.join(script_dir, spec['model_file']))]
+    if not specs:
+        sys.exit("✗ No trained models found, run train_all_models.py first")
+
+    print("=" * 70)
+    print("Compacting Models")
+    print("=" * 70)
+
+    print("\n[1/3] Preparing check inputs...")
+    X = check_inputs(args.check_rows)
+    print(f"   ✓ {len(X):,} rows (dataset, lookup grid sample, fractional and missing answers)")
+
+    print(f"\n[2/3] Compacting {len(specs)} models ({args.leaf_bits}-bit leaves)...")
+    report = []
+    for spec in specs:
+        with open(os.path.join(script_dir, spec['model_file']), 'rb') as f:
+            model_bytes = f.read()
+        compiled = CompiledForest.from_sklearn(pickle.loads(model_bytes))
+        compact = CompactForest.from_compiled(compiled, leaf_bits=args.leaf_bits)
+
+        max_deviation, same_label = deviation(compiled, compact, X)
+        compact.save(
+            os.path.join(script_dir, spec['compact_dir']),
+            model_type=spec['model_type'],
+            source_sha256=hashlib.sha256(model_bytes).hexdigest(),
+            leaf_bits=args.leaf_bits,
+            max_deviation=max_deviation
+        )
+        report.append({
+            'title': spec['title'],
+            'pickle_bytes': len(model_bytes),
+            'forest_bytes': nbytes(compiled),
+            'compact_bytes': nbytes(compact),
+            'nodes': (len(compiled.feature), len(compact.feature)),
+            'leaves': len(compact.value),
+            'max_deviation': max_deviation,
+            'same_label': same_label
+        })
+        print(f"   ✓ {spec['title']}: saved as '{spec['compact_dir']}/'")
+
+    print("\n[3/3] Report")
+    print(f"\n   {'Model':<48}{'Pickle':>9}{'.forest':>9}{'Compact':>9}{'Max |Δp|':>11}{'Same label':>12}")
+    for row in report:
+        print(f"   {row['title']:<48}{row['pickle_bytes'] / 1e6:>7.2f}MB{row['forest_bytes'] / 1e6:>7.2f}MB"
+              f"{row['compact_bytes'] / 1e6:>7.2f}MB{row['max_deviation']:>11.2e}{row['same_label'] * 100:>11.2f}%")
+    for row in report:
+        before, after = row['nodes']
+        print(f"   {row['title']}: {before:,} -> {after:,} nodes ({row['leaves']:,} distinct leaves), "
+              f"{row['forest_bytes'] / row['compact_bytes']:.1f}x smaller than .forest")
+
+    print("\n" + "=" * 70)
+    print("✓ Models compacted successfully!")
+    print("=" * 70)
+    print("\nServe them with model_utils.load_models(engine='compact').")
+
+
+if __name__ == "__main__":
+    main()
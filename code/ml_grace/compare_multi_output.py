@@ -0,0 +1,128 @@
+"""
+Compare the current two-model setup against the single multi-output forest.
+Reports per-target test accuracy, model size and prediction latency for both
+layouts, so we can decide whether serving one forest is worth it.
+Run train_all_models.py and train_multi_output_model.py first.
+
+Usage:
+    python compare_multi_output.py [--repeats 200] [--output report.json]
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+import model_utils
+from dataset import load_encoded_dataset, features_and_target
+from training import MODEL_SPECS, MULTI_OUTPUT_SPEC, split_dataset
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def layout_size(specs):
+    """
+    On-disk size of the pickles and flat artifacts, and total tree nodes.
+    """
+    from forest_engine import CompiledForest
+    pickle_bytes = sum(os.path.getsize(os.path.join(script_dir, spec['model_file'])) for spec in specs)
+    forest_bytes = sum(directory_size(os.path.join(script_dir, spec['forest_dir'])) for spec in specs)
+    n_nodes = sum(
+        CompiledForest.load(os.path.join(script_dir, spec['forest_dir'])).metadata['n_nodes']
+        for spec in specs
+    )
+    return {'pickle_bytes': pickle_bytes, 'forest_bytes': forest_bytes, 'n_nodes': n_nodes}
+
+
+def measure_latency(X_single, X_batch, repeats):
+    """
+    p50 latency of one-row and batch predictions through model_utils.
+    """
+    models = model_utils.load_models()
+    single, batch = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model_utils._predict_encoded(models, X_single)
+        single.append(time.perf_counter() - start)
+    for _ in range(max(3, repeats // 20)):
+        start = time.perf_counter()
+        model_utils._predict_encoded(models, X_batch)
+        batch.append(time.perf_counter() - start)
+    return {
+        'single_p50_ms': float(np.median(single) * 1000),
+        'batch_p50_ms': float(np.median(batch) * 1000),
+        'batch_rows': len(X_batch)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=200, help='timed single-row predictions per setup')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    args = parser.parse_args()
+
+    # Measure the forests themselves, not the table or the cache
+    model_utils.USE_LOOKUP_TABLE = False
+    model_utils.configure_prediction_cache(0)
+
+    print("=" * 70)
+    print("Two Models vs. Multi-Output Model")
+    print("=" * 70)
+
+    # Same test split as the training scripts ------------------------------------------------
+    df = load_encoded_dataset()
+    test_sets = {}
+    for model_name in MODEL_SPECS:
+        X, y = features_and_target(df, model_name)
+        _, X_test, _, y_test = split_dataset(X, y)
+        test_sets[model_name] = (X_test, y_test)
+    X_test = test_sets['depression'][0]
+    X_single = X_test.iloc[:1]
+    X_batch = X_test.sample(1000, replace=True, random_state=0)
+
+    report = {}
+    for layout, specs in [('separate', list(MODEL_SPECS.values())), ('multi_output', [MULTI_OUTPUT_SPEC])]:
+        entry = {'size': layout_size(specs), 'accuracy': {}, 'latency': {}}
+        for engine in ['sklearn', 'compiled']:
+            models = model_utils.load_models(engine=engine, layout=layout)
+            if engine == 'sklearn':
+                for model_name, (X_t, y_t) in test_sets.items():
+                    y_pred = models[f'{model_name}_model'].predict(X_t)
+                    entry['accuracy'][model_name] = float(np.mean(y_pred == y_t.to_numpy()))
+            entry['latency'][engine] = measure_latency(X_single, X_batch, args.repeats)
+        report[layout] = entry
+
+    # Report -------------------------------------------------------------------------------
+    separate, multi = report['separate'], report['multi_output']
+    rows = [
+        ('Depression accuracy', '%', lambda e: e['accuracy']['depression'] * 100),
+        ('Suicidal accuracy', '%', lambda e: e['accuracy']['suicidal'] * 100),
+        ('Pickle size', 'MB', lambda e: e['size']['pickle_bytes'] / 1e6),
+        ('Flat artifact size', 'MB', lambda e: e['size']['forest_bytes'] / 1e6),
+        ('Tree nodes', 'k', lambda e: e['size']['n_nodes'] / 1e3),
+        ('1-row latency, sklearn', 'ms', lambda e: e['latency']['sklearn']['single_p50_ms']),
+        ('1-row latency, compiled', 'ms', lambda e: e['latency']['compiled']['single_p50_ms']),
+        (f'{len(X_batch)}-row latency, sklearn', 'ms', lambda e: e['latency']['sklearn']['batch_p50_ms']),
+        (f'{len(X_batch)}-row latency, compiled', 'ms', lambda e: e['latency']['compiled']['batch_p50_ms']),
+    ]
+    print(f"\n{'Metric':<30}{'Two models':>14}{'Multi-output':>14}{'Change':>10}")
+    print("-" * 68)
+    for label, unit, value in rows:
+        a, b = value(separate), value(multi)
+        change = f"{(b - a) / a * 100:+.0f}%" if a else "n/a"
+        print(f"{label + ' (' + unit + ')':<30}{a:>14.2f}{b:>14.2f}{change:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
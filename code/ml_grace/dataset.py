@@ -0,0 +1,230 @@
+"""
+Shared loading and encoding of the student depression dataset.
+Training scripts and tools use this module so every consumer applies the
+same label encodings as model_utils.
+
+The encoded dataset is cached in dataset_cache/<key>/ as one .npy file per
+column. The key is a hash of the CSV's content and of ENCODINGS, so editing
+the data or an encoding creates a new entry. Later loads memory-map the
+columns instead of parsing and re-encoding the CSV.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from model_utils import ENCODINGS, FEATURE_COLUMNS
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.join(script_dir, '..', '..', 'data'))
+
+from configs import data_dir
+
+# configs.data_dir is relative to this directory
+DEFAULT_DATA_PATH = os.path.normpath(os.path.join(script_dir, data_dir))
+
+CACHE_DIRNAME = 'dataset_cache'
+CACHE_FORMAT = 'dataset-cache-v1'
+DEFAULT_CACHE_DIR = os.path.join(script_dir, CACHE_DIRNAME)
+
+# Model name -> target column
+TARGET_COLUMNS = {
+    'depression': 'Depression',
+    'suicidal': 'Have you ever had suicidal thoughts ?'
+}
+
+
+def encode_dataset(df):
+    """
+    Convert the categorical columns into the numerical codes used for training.
+    Returns a new DataFrame; columns that are not in the frame are skipped.
+    """
+    df = df.copy()
+    for column, mapping in ENCODINGS.items():
+        if column in df:
+            df[column] = df[column].map(mapping)
+    return df
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_sha256(path, cache_dir):
+    """
+    sha256 of the CSV, re-hashed only when its size or mtime changed since
+    the last load (index.json in the cache directory).
+    """
+    index_path = os.path.join(cache_dir, 'index.json')
+    stat = os.stat(path)
+    dataset_stat = [stat.st_size, stat.st_mtime_ns]
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    entry = index.get(os.path.abspath(path))
+    if entry is not None and entry['stat'] == dataset_stat:
+        return entry['sha256']
+
+    sha256 = file_sha256(path)
+    index[os.path.abspath(path)] = {'stat': dataset_stat, 'sha256': sha256}
+    tmp_path = f'{index_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
+    return sha256
+
+
+def dataset_cache_key(source_sha256, encodings=ENCODINGS):
+    """
+    Cache entry name for a CSV content hash and a set of encoding tables.
+    """
+    encoded = json.dumps(encodings, sort_keys=True)
+    return hashlib.sha256(f'{CACHE_FORMAT}:{source_sha256}:{encoded}'.encode()).hexdigest()[:16]
+
+
+def encoded_dataset_key(path=None, cache_dir=None):
+    """
+    Content key of the encoded dataset (CSV hash and ENCODINGS), for tools
+    that cache their own results per dataset version.
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    return dataset_cache_key(_source_sha256(path or DEFAULT_DATA_PATH, cache_dir))
+
+
+def _read_cache_entry(entry_dir, mmap):
+    try:
+        with open(os.path.join(entry_dir, 'columns.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != CACHE_FORMAT:
+        return None
+    mmap_mode = 'r' if mmap else None
+    # np.asarray gives plain ndarray views of the memory maps (no copy)
+    return {
+        column: np.asarray(np.load(os.path.join(entry_dir, f'{i}.npy'), mmap_mode=mmap_mode))
+        for i, column in enumerate(manifest['columns'])
+    }
+
+
+def _write_cache_entry(df, entry_dir, source):
+    """
+    Store each column of df as <index>.npy. The entry is written to a
+    temporary directory and renamed into place, so readers never see a
+    partial entry. Older entries of the same source CSV are removed.
+    """
+    cache_dir = os.path.dirname(entry_dir)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=cache_dir)
+    for i, column in enumerate(df.columns):
+        np.save(os.path.join(tmp_dir, f'{i}.npy'), df[column].to_numpy())
+    with open(os.path.join(tmp_dir, 'columns.json'), 'w') as f:
+        json.dump({'format': CACHE_FORMAT, 'source': source, 'columns': list(df.columns)}, f, indent=2)
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another process wrote the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return
+
+    for name in os.listdir(cache_dir):
+        other_dir = os.path.join(cache_dir, name)
+        if other_dir == entry_dir or not os.path.isdir(other_dir) or name.startswith('.'):
+            continue
+        try:
+            with open(os.path.join(other_dir, 'columns.json')) as f:
+                other_source = json.load(f).get('source')
+        except (OSError, ValueError):
+            continue
+        if other_source == source:
+            shutil.rmtree(other_dir, ignore_errors=True)
+
+
+def load_dataset_columns(path=None, cache_dir=None, mmap=True):
+    """
+    Encoded dataset as numpy arrays, one per column, from the column cache.
+    The first load of a CSV (or of new ENCODINGS) parses and encodes it and
+    writes the cache entry.
+    
+    Args:
+        path: CSV file, defaults to configs.data_dir
+        cache_dir: defaults to dataset_cache/ next to this module
+        mmap: memory-map the cached columns (read-only) instead of reading them
+    
+    Returns:
+        dict: column name -> numpy array, in CSV column order
+    """
+    path = path or DEFAULT_DATA_PATH
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    entry_dir = os.path.join(cache_dir, encoded_dataset_key(path, cache_dir))
+
+    columns = _read_cache_entry(entry_dir, mmap)
+    if columns is not None:
+        return columns
+
+    import pandas as pd
+
+    df = encode_dataset(pd.read_csv(path))
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        # Text left after encoding (an answer outside ENCODINGS) cannot be
+        # stored as a plain array, so this CSV is not cached
+        return {column: df[column].to_numpy() for column in df.columns}
+    _write_cache_entry(df, entry_dir, os.path.abspath(path))
+    return _read_cache_entry(entry_dir, mmap)
+
+
+def load_encoded_dataset(path=None, cache=None):
+    """
+    Read the dataset CSV and encode it.
+    
+    Args:
+        path: CSV file, defaults to configs.data_dir
+        cache: load through the column cache (see load_dataset_columns);
+               by default only the configs.data_dir dataset is cached, so
+               other CSVs (new responses, test files) leave no cache entries
+    
+    Returns:
+        pandas DataFrame with FEATURE_COLUMNS and both target columns encoded
+    """
+    import pandas as pd
+    
+    if cache is None:
+        cache = path is None or os.path.abspath(path) == DEFAULT_DATA_PATH
+    if cache:
+        # copy=False keeps the memory-mapped columns instead of copying them
+        return pd.DataFrame(load_dataset_columns(path), copy=False)
+    df = pd.read_csv(path or DEFAULT_DATA_PATH)
+    return encode_dataset(df)
+
+
+def iter_encoded_chunks(path=None, chunk_size=10000):
+    """
+    Read the dataset CSV in chunks of chunk_size rows and encode each one,
+    for datasets that do not fit in memory.
+    
+    Yields:
+        encoded pandas DataFrames (index continues across chunks)
+    """
+    import pandas as pd
+    
+    for chunk in pd.read_csv(path or DEFAULT_DATA_PATH, chunksize=chunk_size):
+        yield encode_dataset(chunk)
+
+
+def features_and_target(df, model_name):
+    """
+    Split an encoded DataFrame into the feature matrix and one model's target.
+    """
+    return df[FEATURE_COLUMNS], df[TARGET_COLUMNS[model_name]]
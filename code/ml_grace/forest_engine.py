@@ -0,0 +1,388 @@
+"""
+NumPy inference engine for the trained Random Forest models.
+Flattens every tree of a fitted RandomForestClassifier into contiguous arrays
+and evaluates all trees for a batch at once, level by level, instead of going
+through sklearn's per-estimator Python loop and input validation.
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Rows evaluated together; bounds the (rows x trees x classes) scratch arrays
+DEFAULT_BATCH_SIZE = 1024
+
+# On-disk format: one directory per model with a .npy file per array and a
+# small JSON header, so the arrays can be memory-mapped read-only. v2 added
+# missing_go_to_left; v1 directories route NaN differently and are rejected
+ARTIFACT_FORMAT = 'forest-v2'
+COMPACT_FORMAT = 'forest-compact-v2'
+HEADER_FILENAME = 'header.json'
+ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'missing_go_to_left', 'value', 'roots')
+
+
+class CompiledForest:
+    """
+    All trees of a forest stored as flat node arrays.
+
+    Node arrays (one entry per node, all trees concatenated):
+        feature: feature index tested at the node (0 for leaves)
+        threshold: go left when X[feature] <= threshold
+        left, right: global index of the children (leaves point to themselves)
+        missing_go_to_left: go left when X[feature] is NaN (sklearn's
+               tree_.missing_go_to_left), otherwise a NaN goes right
+        value: class distribution per node, shape (n_nodes, n_outputs, n_classes),
+               already normalized the same way DecisionTreeClassifier.predict_proba does
+
+    Per-tree arrays:
+        roots: global index of each tree's root node
+    """
+
+    artifact_format = ARTIFACT_FORMAT
+
+    def __init__(self, feature, threshold, left, right, missing_go_to_left, value, roots, max_depth,
+                 classes, n_features, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_go_to_left = missing_go_to_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.metadata = {}
+
+        # Mirror sklearn: a single array for one output, a list for several
+        self.n_outputs_ = value.shape[1]
+        if self.n_outputs_ == 1:
+            self.classes_ = np.asarray(classes[0])
+        else:
+            self.classes_ = [np.asarray(c) for c in classes]
+        self._n_classes = [len(c) for c in classes]
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """
+        Build a CompiledForest from a fitted RandomForestClassifier.
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        missing_lefts = []
+        classes = forest.classes_ if forest.n_outputs_ > 1 else [forest.classes_]
+        n_classes = [len(c) for c in classes]
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back to themselves so every tree can run max_depth steps
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            feature = np.where(is_leaf, 0, tree.feature)
+            # Only trees of sklearn versions that accept NaN inputs have it
+            missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+            missing_left = np.where(is_leaf, False, np.asarray(missing_left, dtype=bool))
+
+            # Normalize per output exactly like DecisionTreeClassifier.predict_proba
+            value = np.array(tree.value, dtype=np.float64)
+            for k, n_k in enumerate(n_classes):
+                proba_k = value[:, k, :n_k]
+                normalizer = proba_k.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                value[:, k, :n_k] = proba_k / normalizer
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            missing_lefts.append(missing_left)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int64),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int64),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int64),
+            missing_go_to_left=np.ascontiguousarray(np.concatenate(missing_lefts), dtype=bool),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            classes=classes,
+            n_features=forest.n_features_in_,
+            feature_names=getattr(forest, 'feature_names_in_', None)
+        )
+
+    def save(self, directory, **metadata):
+        """
+        Write the forest as a flat artifact directory.
+        Every file is written under a temporary name and moved into place, so
+        processes that still map the previous version keep valid pages.
+        The header goes last; a directory without it is never loaded.
+
+        Args:
+            metadata: extra JSON-serializable fields stored in the header
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            path = os.path.join(directory, f'{name}.npy')
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(path + '.tmp', path)
+
+        classes = [self.classes_] if self.n_outputs_ == 1 else self.classes_
+        header = {
+            'format': self.artifact_format,
+            'n_estimators': self.n_estimators,
+            'n_nodes': len(self.feature),
+            'max_depth': self.max_depth,
+            'n_features': self.n_features_in_,
+            'feature_names': None if self.feature_names_in_ is None else [str(n) for n in self.feature_names_in_],
+            'classes': [np.asarray(c).tolist() for c in classes],
+            'arrays': {
+                name: {'dtype': str(getattr(self, name).dtype), 'shape': list(getattr(self, name).shape)}
+                for name in ARRAY_NAMES
+            },
+            **metadata
+        }
+        path = os.path.join(directory, HEADER_FILENAME)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(header, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Load a flat artifact directory written by save().
+        With mmap=True the arrays are read-only memory maps: nothing is copied
+        at startup and processes loading the same files share the pages.
+        The header fields are available as forest.metadata.
+        """
+        with open(os.path.join(directory, HEADER_FILENAME)) as f:
+            header = json.load(f)
+        if header.get('format') != cls.artifact_format:
+            raise ValueError(
+                f"{directory}: unsupported model format {header.get('format')!r}, expected "
+                f"{cls.artifact_format!r}; save the model again to rebuild it"
+            )
+
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r' if mmap else None)
+            for name in ARRAY_NAMES
+        }
+        forest = cls(
+            max_depth=header['max_depth'],
+            classes=header['classes'],
+            n_features=header['n_features'],
+            feature_names=header['feature_names'],
+            **arrays
+        )
+        forest.metadata = header
+        return forest
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def _as_array(self, X):
+        # DataFrames are reordered to the training columns when names are known
+        if hasattr(X, 'columns') and self.feature_names_in_ is not None:
+            X = X[list(self.feature_names_in_)]
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return np.ascontiguousarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+
+    def apply(self, X):
+        """
+        Return the leaf reached in every tree, shape (n_samples, n_estimators).
+        """
+        X = self._as_array(X)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        row_offset = (np.arange(n_samples, dtype=np.int64) * n_features)[:, np.newaxis]
+
+        # Missing answers (NaN) follow missing_go_to_left, like sklearn; the
+        # extra lookups are skipped for batches without NaN
+        has_missing = bool(np.isnan(flat_X).any())
+
+        node = np.broadcast_to(self.roots, (n_samples, len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            x = flat_X[row_offset + self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_go_to_left[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _predict_proba_chunk(self, X):
+        leaves = self.apply(X)
+        # Sequential sum over trees (cumsum) matches sklearn's accumulation order bit for bit
+        leaf_values = self.value[leaves]
+        total = np.cumsum(leaf_values, axis=1)[:, -1]
+        return total / len(self.roots)
+
+    def predict_proba(self, X):
+        """
+        Class probabilities averaged over all trees, like RandomForestClassifier.predict_proba.
+        """
+        X = self._as_array(X)
+        chunks = [
+            self._predict_proba_chunk(X[start:start + self.batch_size])
+            for start in range(0, len(X), self.batch_size)
+        ]
+        proba = np.concatenate(chunks) if chunks else np.zeros((0,) + self.value.shape[1:])
+
+        outputs = [proba[:, k, :n_k] for k, n_k in enumerate(self._n_classes)]
+        return outputs[0] if self.n_outputs_ == 1 else outputs
+
+    def predict(self, X):
+        """
+        Most probable class, like RandomForestClassifier.predict.
+        """
+        proba = self.predict_proba(X)
+        if self.n_outputs_ == 1:
+            return self.classes_.take(np.argmax(proba, axis=1))
+        return np.stack([
+            classes.take(np.argmax(proba_k, axis=1))
+            for classes, proba_k in zip(self.classes_, proba)
+        ], axis=1)
+
+
+class CompactForest(CompiledForest):
+    """
+    A CompiledForest with smaller types and shared subtrees:
+        feature: uint8
+        threshold: float32, rounded down so that float32 inputs take the same
+                   branch as with the float64 threshold
+        left, right, roots: uint32 (int64 if there are more nodes)
+        missing_go_to_left: bool, as in CompiledForest
+        value: leaf class distributions quantized to uint8/uint16 steps of
+               1/value_scale, stored for the leaves only (node ids below
+               len(value) are the leaves)
+
+    Identical leaves and identical subtrees (same split, same NaN direction
+    and same children)
+    are stored once for the whole forest, and a split whose two children
+    became identical is replaced by the child. Only the quantization of the
+    leaves changes the probabilities.
+    """
+
+    artifact_format = COMPACT_FORMAT
+
+    def __init__(self, *args, value_scale=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.value_scale = value_scale
+
+    @classmethod
+    def from_compiled(cls, forest, leaf_bits=16):
+        """
+        Build a CompactForest from a CompiledForest.
+        """
+        if forest.n_features_in_ > 256:
+            raise ValueError(f"uint8 feature ids need at most 256 features, got {forest.n_features_in_}")
+        value_dtype = {8: np.uint8, 16: np.uint16}[leaf_bits]
+        value_scale = np.iinfo(value_dtype).max
+
+        n_nodes = len(forest.feature)
+        node_ids = np.arange(n_nodes)
+        is_leaf = np.asarray(forest.left) == node_ids
+
+        # Quantize every leaf; the largest class takes the rounding remainder so
+        # each distribution still adds up to value_scale
+        quantized = np.rint(np.asarray(forest.value)[is_leaf] * value_scale).astype(np.int64)
+        for k, n_k in enumerate(forest._n_classes):
+            top = np.argmax(quantized[:, k, :n_k], axis=1)
+            rows = np.arange(len(quantized))
+            quantized[rows, k, top] += value_scale - quantized[:, k, :n_k].sum(axis=1)
+        leaf_values, leaf_ids = np.unique(quantized.reshape(len(quantized), -1), axis=0, return_inverse=True)
+        n_leaves = len(leaf_values)
+
+        # Child ids are always larger than the parent's, so walking the nodes
+        # backwards visits both children of a split before the split itself
+        canonical = np.zeros(n_nodes, dtype=np.int64)
+        canonical[is_leaf] = leaf_ids.ravel()
+        canonical = canonical.tolist()
+        feature = np.asarray(forest.feature).tolist()
+        threshold = _round_down_float32(np.asarray(forest.threshold)).tolist()
+        left = np.asarray(forest.left).tolist()
+        right = np.asarray(forest.right).tolist()
+        missing_left = np.asarray(forest.missing_go_to_left).tolist()
+        splits = {}
+        for node in reversed(np.flatnonzero(~is_leaf).tolist()):
+            left_id, right_id = canonical[left[node]], canonical[right[node]]
+            if left_id == right_id:
+                canonical[node] = left_id
+                continue
+            key = (feature[node], threshold[node], missing_left[node], left_id, right_id)
+            canonical[node] = splits.setdefault(key, n_leaves + len(splits))
+
+        n_total = n_leaves + len(splits)
+        index_dtype = np.uint32 if n_total < 2 ** 32 else np.int64
+        new_feature = np.zeros(n_total, dtype=np.uint8)
+        new_threshold = np.zeros(n_total, dtype=np.float32)
+        new_left = np.arange(n_total, dtype=index_dtype)
+        new_right = np.arange(n_total, dtype=index_dtype)
+        new_missing_left = np.zeros(n_total, dtype=bool)
+        if splits:
+            keys = np.array(list(splits), dtype=np.float64)
+            new_feature[n_leaves:] = keys[:, 0]
+            new_threshold[n_leaves:] = keys[:, 1]
+            new_missing_left[n_leaves:] = keys[:, 2]
+            new_left[n_leaves:] = keys[:, 3]
+            new_right[n_leaves:] = keys[:, 4]
+
+        classes = [forest.classes_] if forest.n_outputs_ == 1 else forest.classes_
+        return cls(
+            feature=new_feature,
+            threshold=new_threshold,
+            left=new_left,
+            right=new_right,
+            missing_go_to_left=new_missing_left,
+            value=np.ascontiguousarray(leaf_values.reshape((n_leaves,) + forest.value.shape[1:]), dtype=value_dtype),
+            roots=np.asarray([canonical[root] for root in np.asarray(forest.roots).tolist()], dtype=index_dtype),
+            max_depth=forest.max_depth,
+            classes=classes,
+            n_features=forest.n_features_in_,
+            feature_names=forest.feature_names_in_,
+            value_scale=value_scale
+        )
+
+    def save(self, directory, **metadata):
+        super().save(directory, value_scale=self.value_scale, **metadata)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        forest = super().load(directory, mmap=mmap)
+        forest.value_scale = forest.metadata['value_scale']
+        return forest
+
+    def _predict_proba_chunk(self, X):
+        leaves = self.apply(X)
+        # Integer sums are exact, so the tree order does not matter here
+        total = self.value[leaves].sum(axis=1, dtype=np.float64)
+        return total / (len(self.roots) * self.value_scale)
+
+
+def _round_down_float32(threshold):
+    """
+    float32 thresholds t32 <= t such that x <= t32 exactly when x <= t for
+    every float32 x (the trees compare float32 inputs).
+    """
+    threshold32 = threshold.astype(np.float32)
+    too_high = threshold32.astype(np.float64) > threshold
+    threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+    return threshold32
+
+
+def nbytes(forest):
+    """
+    Bytes of the node and leaf arrays of a (compiled or compact) forest.
+    """
+    return int(sum(getattr(forest, name).nbytes for name in ARRAY_NAMES))
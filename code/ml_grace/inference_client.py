@@ -0,0 +1,60 @@
+"""
+Client for inference_service.py.
+InferenceClient.predict_both has the same signature and return keys as
+model_utils.predict_both, so the web apps can switch to the service by
+setting DEPRESSION_ANALYZER_INFERENCE_URL (e.g. http://127.0.0.1:8765).
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+
+INFERENCE_URL = os.environ.get('DEPRESSION_ANALYZER_INFERENCE_URL')
+
+# Seconds to wait for the service before giving up on a request
+DEFAULT_TIMEOUT = 10.0
+
+
+class InferenceClient:
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode()
+        request = urllib.request.Request(
+            self.url + path, data=data,
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            # The service explains rejected requests in the body
+            message = json.loads(e.read() or b'{}').get('error', e.reason)
+            raise RuntimeError(f"Inference service error {e.code}: {message}") from None
+
+    def health(self):
+        return self._request('/health')
+
+    def predict_both(self, gender, age, academic_pressure, study_satisfaction,
+                     sleep_duration, dietary_habits, study_hours,
+                     financial_stress, family_history):
+        """
+        Predict both depression and suicidal thoughts risk through the service.
+
+        Returns:
+            dict with the same keys as model_utils.predict_both
+        """
+        return self._request('/predict', {
+            'gender': gender,
+            'age': age,
+            'academic_pressure': academic_pressure,
+            'study_satisfaction': study_satisfaction,
+            'sleep_duration': sleep_duration,
+            'dietary_habits': dietary_habits,
+            'study_hours': study_hours,
+            'financial_stress': financial_stress,
+            'family_history': family_history
+        })
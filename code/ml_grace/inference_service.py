@@ -0,0 +1,297 @@
+"""
+Standalone local HTTP inference service with request micro-batching.
+
+Concurrent requests are collected for up to --max-wait-ms (or until
+--max-batch-size requests are waiting), scored with one predict_batch call
+and the results are fanned back out. The web apps use it instead of loading
+the forests themselves when DEPRESSION_ANALYZER_INFERENCE_URL is set (see
+inference_client.py).
+
+Endpoints:
+    POST /predict   JSON object with the predict_both arguments -> predict_both result
+    GET  /health    model version, engine and batching settings
+    GET  /metrics   metrics.py histograms in the Prometheus text format
+
+Usage:
+    python inference_service.py [--host 127.0.0.1] [--port 8765]
+                                [--max-batch-size 64] [--max-wait-ms 5]
+                                [--engine sklearn|compiled|mmap|compact]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import metrics
+import model_utils
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# Largest request body accepted, a single survey is well under 1 KB
+MAX_BODY_BYTES = 64 * 1024
+
+NUMERIC_FIELDS = model_utils.NUMERIC_INPUTS
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class MicroBatcher:
+    """
+    Groups concurrent submit() calls into batches for one vectorized call.
+
+    A batch is closed when max_batch_size rows are waiting or max_wait_ms have
+    passed since its first row arrived. predict_fn runs in a worker thread, so
+    the event loop keeps accepting the requests for the next batch meanwhile.
+    """
+
+    def __init__(self, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 predict_fn=None):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.predict_fn = predict_fn or model_utils.predict_batch
+        self.batches = 0
+        self.rows = 0
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row):
+        """
+        Queue one row (dict of predict_both arguments) and wait for its result.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Take whatever else is already waiting without delaying the batch
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            rows = [row for row, _ in batch]
+            columns = {name: [row[name] for row in rows] for name in model_utils.INPUT_COLUMNS}
+            self.batches += 1
+            self.rows += len(rows)
+            metrics.increment('service_batches')
+            metrics.increment('service_rows', len(rows))
+            try:
+                with metrics.timed('service_batch'):
+                    results = await loop.run_in_executor(None, self.predict_fn, columns)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result({
+                        'depression_prediction': int(results['depression_prediction'][i]),
+                        'depression_probability': float(results['depression_probability'][i]),
+                        'suicidal_prediction': int(results['suicidal_prediction'][i]),
+                        'suicidal_probability': float(results['suicidal_probability'][i])
+                    })
+
+
+def parse_prediction_request(body):
+    """
+    Returns:
+        dict with exactly the predict_both arguments
+
+    Raises:
+        ValueError: if the body is not a JSON object with all arguments, or an
+            argument has the wrong type; checked here so one bad request gets
+            a 400 instead of failing the whole micro-batch
+    """
+    try:
+        payload = json.loads(body, parse_constant=_reject_constant)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("Expected a JSON object")
+    missing = [name for name in model_utils.INPUT_COLUMNS if name not in payload]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    row = {name: payload[name] for name in model_utils.INPUT_COLUMNS}
+    for name, value in row.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError(f"Field '{name}' must be a string or a number")
+        if isinstance(value, str) and name not in NUMERIC_FIELDS:
+            continue
+        # Numeric fields, and the numeric codes of the others (1e400 parses
+        # as inf), must be finite or predict_batch fails for the whole batch
+        try:
+            number = float(value)
+        except (ValueError, OverflowError):
+            raise ValueError(f"Field '{name}' must be a number, got {value!r}")
+        if not math.isfinite(number):
+            raise ValueError(f"Field '{name}' must be a finite number")
+        if name in NUMERIC_FIELDS:
+            row[name] = number
+    return row
+
+
+def _reject_constant(name):
+    # json.loads accepts NaN, Infinity and -Infinity, which are not JSON
+    raise ValueError(f"Invalid JSON: {name} is not allowed")
+
+
+async def read_request(reader):
+    """
+    Read one HTTP/1.1 request.
+
+    Returns:
+        tuple: (method, path, headers, body), or None when the client closed
+        the connection
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY_BYTES:
+        return method, path, headers, None
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+def write_response(writer, status, body, content_type='application/json'):
+    if not isinstance(body, bytes):
+        body = (json.dumps(body) if content_type == 'application/json' else body).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+
+
+async def handle_connection(reader, writer, batcher, info):
+    """
+    Serve requests on one keep-alive connection until the client closes it.
+    """
+    try:
+        while True:
+            request = await read_request(reader)
+            if request is None:
+                break
+            method, path, headers, body = request
+
+            if body is None:
+                write_response(writer, 413, {'error': f'Body larger than {MAX_BODY_BYTES} bytes'})
+                break
+            if method == 'POST' and path == '/predict':
+                try:
+                    row = parse_prediction_request(body)
+                except ValueError as e:
+                    write_response(writer, 400, {'error': str(e)})
+                else:
+                    try:
+                        with metrics.timed('service_request'):
+                            result = await batcher.submit(row)
+                        write_response(writer, 200, result)
+                    except Exception as e:
+                        write_response(writer, 500, {'error': str(e)})
+            elif method == 'GET' and path == '/health':
+                write_response(writer, 200, dict(info, batches=batcher.batches, rows=batcher.rows))
+            elif method == 'GET' and path == '/metrics':
+                write_response(writer, 200, metrics.export_prometheus(), 'text/plain; version=0.0.4')
+            else:
+                write_response(writer, 404, {'error': f'No route for {method} {path}'})
+
+            await writer.drain()
+            if headers.get('connection', '').lower() == 'close':
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                max_wait_ms=DEFAULT_MAX_WAIT_MS, engine=None, sock=None):
+    """
+    Run the service until cancelled. With sock, accept connections on an
+    already listening socket instead of binding host:port (prefork_server.py).
+    """
+    models = model_utils.load_models(engine=engine)
+    info = {
+        'model_version': models['version'],
+        'engine': models['engine'],
+        'max_batch_size': max_batch_size,
+        'max_wait_ms': max_wait_ms
+    }
+    batcher = MicroBatcher(max_batch_size, max_wait_ms)
+    batcher.start()
+
+    def handler(reader, writer):
+        return handle_connection(reader, writer, batcher, info)
+
+    if sock is not None:
+        server = await asyncio.start_server(handler, sock=sock)
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        print(f"✓ Serving model {info['model_version']} ({info['engine']}) on http://{host}:{port}")
+        print(f"  Batches of up to {max_batch_size} requests, waiting at most {max_wait_ms} ms")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--engine', choices=model_utils.ENGINES)
+    args = parser.parse_args()
+
+    metrics.enable()
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch_size, args.max_wait_ms, args.engine))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Precomputed risk lookup table over the discrete input space.
+Every answer the web forms collect is a small bounded integer once encoded,
+so both models can be scored once for every combination and served with a
+single array lookup. Cells are indexed with a mixed-radix encoding of the
+feature values and stored as a read-only float64 memory map, so a table
+answer is exactly the probability the forest returns.
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Encoded value range (inclusive) of every feature, in model feature order
+LOOKUP_AXES = [
+    ('Gender', 0, 1),
+    ('Age', 18, 34),
+    ('Academic Pressure', 1, 5),
+    ('Study Satisfaction', 1, 5),
+    ('Sleep Duration', 1, 4),
+    ('Dietary Habits', 1, 3),
+    ('Study Hours', 0, 12),
+    ('Financial Stress', 1, 5),
+    ('Family History of Mental Illness', 0, 1)
+]
+
+# Stored columns: probability of class 1 for each model
+TABLE_COLUMNS = ['depression_probability', 'suicidal_probability']
+
+TABLE_FORMAT = 'risk-lookup-v2'
+# float64, like predict_proba: any rounding would move cells across the
+# risk bands of the apps (0.35, 0.5, 0.65)
+TABLE_DTYPE = np.float64
+HEADER_FILENAME = 'risk_lookup.json'
+DATA_FILENAME = 'risk_lookup.bin'
+
+
+def axis_values(axes=LOOKUP_AXES):
+    """
+    The grid values of every axis, as float64 arrays.
+    """
+    return [np.arange(low, high + 1, dtype=np.float64) for _, low, high in axes]
+
+
+def score_grid(forest, axes=LOOKUP_AXES):
+    """
+    Class probabilities of a CompiledForest for every cell of the grid.
+
+    Each tree splits the grid into boxes (one per leaf), so instead of walking
+    every cell through every tree, the leaf distribution is added to its whole
+    box with one slice. The boxes of a tree never overlap and trees are added
+    in order, which reproduces predict_proba bit for bit.
+
+    Returns:
+        float64 array of shape (*axis sizes, n_classes)
+    """
+    values = axis_values(axes)
+    # Trees compare float32 inputs against float64 thresholds
+    values32 = [v.astype(np.float32).astype(np.float64) for v in values]
+    n_classes = len(forest.classes_)
+    grid = np.zeros([len(v) for v in values] + [n_classes], dtype=np.float64)
+    leaf_value = forest.value[:, 0, :n_classes]
+
+    for root in forest.roots:
+        stack = [(root, tuple((0, len(v)) for v in values))]
+        while stack:
+            node, box = stack.pop()
+            left, right = forest.left[node], forest.right[node]
+            if left == node:
+                grid[tuple(slice(lo, hi) for lo, hi in box)] += leaf_value[node]
+                continue
+
+            feature = forest.feature[node]
+            lo, hi = box[feature]
+            split = lo + np.searchsorted(values32[feature][lo:hi], forest.threshold[node], side='right')
+            if split > lo:
+                stack.append((left, box[:feature] + ((lo, split),) + box[feature + 1:]))
+            if split < hi:
+                stack.append((right, box[:feature] + ((split, hi),) + box[feature + 1:]))
+
+    return grid / len(forest.roots)
+
+
+def _to_table_column(proba):
+    """
+    Class-1 probability of every cell, unchanged.
+
+    Raises:
+        ValueError: if "probability > 0.5" (the rule model_utils applies to
+                    table answers) would not give the forest's argmax label
+    """
+    proba = proba.reshape(-1, proba.shape[-1])
+    column = proba[:, 1].astype(TABLE_DTYPE)
+    mismatched = int(np.sum((np.argmax(proba, axis=1) == 1) != (column > 0.5)))
+    if mismatched:
+        raise ValueError(f"{mismatched} cells have class probabilities that do not add up to a clear label")
+    return column
+
+
+def build_table(depression_model, suicidal_model, model_version, directory, axes=LOOKUP_AXES):
+    """
+    Score every grid cell with both (compiled) models and write the table.
+
+    Returns:
+        dict with the written header
+    """
+    columns = [_to_table_column(score_grid(model, axes)) for model in (depression_model, suicidal_model)]
+    table = np.stack(columns, axis=1)
+
+    data_path = os.path.join(directory, DATA_FILENAME)
+    out = np.memmap(data_path, dtype=TABLE_DTYPE, mode='w+', shape=table.shape)
+    out[:] = table
+    out.flush()
+    del out
+
+    header = {
+        'format': TABLE_FORMAT,
+        'model_version': model_version,
+        'dtype': np.dtype(TABLE_DTYPE).name,
+        'shape': list(table.shape),
+        'axes': [[name, low, high] for name, low, high in axes],
+        'columns': TABLE_COLUMNS
+    }
+    with open(os.path.join(directory, HEADER_FILENAME), 'w') as f:
+        json.dump(header, f, indent=2)
+    return header
+
+
+class RiskLookupTable:
+    """
+    Read-only view of a built table.
+    """
+
+    def __init__(self, probabilities, axes, model_version):
+        self.probabilities = probabilities
+        self.model_version = model_version
+        self.low = np.array([low for _, low, _ in axes], dtype=np.float64)
+        self.high = np.array([high for _, _, high in axes], dtype=np.float64)
+
+        # Mixed-radix strides: the last feature varies fastest
+        sizes = (self.high - self.low + 1).astype(np.int64)
+        self.strides = np.concatenate([np.cumprod(sizes[::-1])[::-1][1:], [1]]).astype(np.int64)
+
+    @classmethod
+    def load(cls, directory, model_version=None):
+        """
+        Memory-map the table in a directory.
+        Returns None if it is missing or was built for another model version.
+        """
+        header_path = os.path.join(directory, HEADER_FILENAME)
+        if not os.path.exists(header_path):
+            return None
+        with open(header_path) as f:
+            header = json.load(f)
+
+        if header.get('format') != TABLE_FORMAT:
+            return None
+        if model_version is not None and header['model_version'] != model_version:
+            return None
+
+        probabilities = np.memmap(
+            os.path.join(directory, DATA_FILENAME),
+            dtype=header['dtype'], mode='r', shape=tuple(header['shape'])
+        )
+        return cls(probabilities, header['axes'], header['model_version'])
+
+    def lookup(self, X):
+        """
+        Look up encoded feature rows.
+
+        Args:
+            X: array of shape (n_samples, n_features) in model feature order
+
+        Returns:
+            tuple: (in_range mask, float64 probabilities of the in-range rows,
+                    columns as TABLE_COLUMNS)
+        """
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.strides))
+        in_range = ((X >= self.low) & (X <= self.high) & (X == np.floor(X))).all(axis=1)
+        cells = (X[in_range] - self.low).astype(np.int64) @ self.strides
+        return in_range, self.probabilities[cells].astype(np.float64)
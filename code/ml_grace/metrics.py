@@ -0,0 +1,227 @@
+"""
+In-process latency histograms and counters for the prediction pipeline.
+
+Stages are timed with `timed(stage)` and exported in the Prometheus text
+format. Recording is off by default; set DEPRESSION_ANALYZER_METRICS=1 (or
+DEPRESSION_ANALYZER_METRICS_FILE to a path) to turn it on, or call enable().
+While disabled, timed() returns a shared no-op context manager and
+increment() returns immediately.
+
+Usage:
+    import metrics
+    with metrics.timed('preprocess'):
+        ...
+    print(metrics.export_prometheus())
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+import time
+
+METRIC_PREFIX = 'depression_analyzer'
+
+# Upper bounds (seconds) of the latency histogram buckets, +Inf is implicit
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Prometheus text file written by dump() when no path is given
+METRICS_FILE = os.environ.get('DEPRESSION_ANALYZER_METRICS_FILE')
+
+_enabled = os.environ.get('DEPRESSION_ANALYZER_METRICS', '0') == '1' or bool(METRICS_FILE)
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram (the Prometheus histogram layout).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def cumulative_counts(self):
+        """
+        Returns:
+            list of (upper bound, observations <= bound), ending with +Inf
+        """
+        total = 0
+        counts = []
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            total += count
+            counts.append((bound, total))
+        counts.append((float('inf'), self.count))
+        return counts
+
+
+class _Timer:
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def timed(stage):
+    """
+    Context manager recording the duration of the block into the stage's
+    histogram (a shared no-op while metrics are disabled).
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(stage)
+
+
+def observe(stage, seconds):
+    """
+    Record one duration for a stage.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+
+def increment(name, amount=1, **labels):
+    """
+    Add to a counter, e.g. increment('predictions', 3, source='lookup').
+    """
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def reset():
+    """
+    Drop all recorded histograms and counters.
+    """
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def snapshot():
+    """
+    Returns:
+        dict with 'stages' (stage -> count, sum_seconds, buckets) and
+        'counters' (name -> list of {'labels', 'value'})
+    """
+    with _lock:
+        stages = {
+            stage: {
+                'count': histogram.count,
+                'sum_seconds': histogram.sum,
+                'buckets': histogram.cumulative_counts()
+            }
+            for stage, histogram in _histograms.items()
+        }
+        counters = {}
+        for (name, labels), value in _counters.items():
+            counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+    return {'stages': stages, 'counters': counters}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def export_prometheus():
+    """
+    Render all metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    data = snapshot()
+
+    if data['stages']:
+        name = f'{METRIC_PREFIX}_stage_seconds'
+        lines.append(f'# HELP {name} Time spent in each prediction pipeline stage.')
+        lines.append(f'# TYPE {name} histogram')
+        for stage, histogram in sorted(data['stages'].items()):
+            for bound, count in histogram['buckets']:
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{_format_bound(bound)}"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram["sum_seconds"]!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram["count"]}')
+
+    for counter, series in sorted(data['counters'].items()):
+        name = f'{METRIC_PREFIX}_{counter}_total'
+        lines.append(f'# TYPE {name} counter')
+        for entry in series:
+            labels = _format_labels(sorted(entry['labels'].items()))
+            lines.append(f'{name}{labels} {entry["value"]}')
+
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def dump(path=None):
+    """
+    Write export_prometheus() to a file (METRICS_FILE by default), replacing
+    it atomically so a scraper never reads a half-written file.
+
+    Returns:
+        the path written, or None if no path is configured
+    """
+    path = path or METRICS_FILE
+    if not path:
+        return None
+    # A unique temporary file per call, so concurrent dumps (Streamlit
+    # sessions, service workers) never rename each other's file
+    fd, tmp_path = tempfile.mkstemp(prefix=f'{os.path.basename(path)}.', suffix='.tmp',
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(export_prometheus())
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
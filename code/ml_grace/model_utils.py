@@ -1,69 +1,376 @@
 """
 Utility functions for loading ML models and making predictions.
 This module provides a simple interface for the web applications.
+
+pandas (and sklearn, through the pickles) are imported on first use rather
+than at import time, to keep web app cold starts short.
 """
 
+import copy
+import hashlib
 import pickle
-import pandas as pd
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
 import os
 
+import metrics
+
 # Cache for loaded models
 _models_cache = None
 
-def load_models():
+# Inference engines selectable in load_models:
+#   'sklearn'  - the pickled RandomForestClassifier objects
+#   'compiled' - the same forests flattened into NumPy arrays (forest_engine.py)
+#   'mmap'     - the flat *.forest artifacts written by the training scripts,
+#                memory-mapped read-only instead of unpickled
+#   'compact'  - the *.compact artifacts written by compact_models.py (smaller
+#                types, shared subtrees, quantized leaves), memory-mapped
+ENGINES = ('sklearn', 'compiled', 'mmap', 'compact')
+DEFAULT_ENGINE = 'sklearn'
+
+# Model layouts selectable in load_models:
+#   'separate'     - one forest per target (depression_model, suicidal_model)
+#   'multi_output' - a single forest predicting both targets
+#                    (train_multi_output_model.py), one traversal per request
+LAYOUTS = ('separate', 'multi_output')
+DEFAULT_LAYOUT = 'separate'
+
+# Answer in-range requests from the precomputed table (build_lookup_table.py)
+# when one exists for the loaded model version
+USE_LOOKUP_TABLE = True
+
+# Maximum number of distinct answer combinations kept by predict_both (0 disables)
+PREDICTION_CACHE_SIZE = 4096
+
+# Feature order shared by both models
+FEATURE_COLUMNS = [
+    'Gender', 'Age', 'Academic Pressure', 'Study Satisfaction',
+    'Sleep Duration', 'Dietary Habits', 'Study Hours',
+    'Financial Stress', 'Family History of Mental Illness'
+]
+
+# Label encodings used when the models were trained
+ENCODINGS = {
+    'Gender': {'Male': 0, 'Female': 1},
+    'Sleep Duration': {
+        'Less than 5 hours': 1,
+        '5-6 hours': 2,
+        '7-8 hours': 3,
+        'More than 8 hours': 4
+    },
+    'Dietary Habits': {'Unhealthy': 1, 'Moderate': 2, 'Healthy': 3},
+    'Have you ever had suicidal thoughts ?': {'No': 0, 'Yes': 1},
+    'Family History of Mental Illness': {'No': 0, 'Yes': 1},
+    'Depression': {'No': 0, 'Yes': 1}
+}
+
+# Text answers accepted from the web forms, including the short "h" labels
+SLEEP_DURATION_MAP = {
+    'Less than 5 hours': 1,
+    'Less than 5 h': 1,
+    '5-6 hours': 2,
+    '5-6 h': 2,
+    '7-8 hours': 3,
+    '7-8 h': 3,
+    'More than 8 hours': 4,
+    'More than 8 h': 4
+}
+DIETARY_HABITS_MAP = ENCODINGS['Dietary Habits']
+
+# predict_* argument name -> model feature column
+INPUT_COLUMNS = {
+    'gender': 'Gender',
+    'age': 'Age',
+    'academic_pressure': 'Academic Pressure',
+    'study_satisfaction': 'Study Satisfaction',
+    'sleep_duration': 'Sleep Duration',
+    'dietary_habits': 'Dietary Habits',
+    'study_hours': 'Study Hours',
+    'financial_stress': 'Financial Stress',
+    'family_history': 'Family History of Mental Illness'
+}
+
+# predict_* arguments that must be numbers, the others are text answers
+# or their numeric codes
+NUMERIC_INPUTS = ('age', 'academic_pressure', 'study_satisfaction', 'study_hours', 'financial_stress')
+
+# Per-thread input row reused by predict_both
+_row_buffers = threading.local()
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of predict_both results, keyed on the encoded feature
+    tuple. Entries are dropped whenever load_models loads models, so a new
+    model version (or a rebuilt lookup table) never serves stale results.
+    """
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(result)
+    
+    def put(self, key, result):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, model_version):
+        """Drop all entries and record the model version now being served."""
+        with self._lock:
+            self._entries.clear()
+            self.model_version = model_version
+    
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'model_version': self.model_version
+            }
+
+
+_prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE)
+
+
+def configure_prediction_cache(maxsize):
+    """
+    Change the maximum number of cached predictions (0 disables caching).
+    """
+    _prediction_cache.resize(maxsize)
+
+
+def get_prediction_cache_stats():
+    """
+    Returns:
+        dict with hits, misses, evictions, size, maxsize and model_version
+    """
+    return _prediction_cache.stats()
+
+
+def clear_prediction_cache():
+    """
+    Drop all cached predictions and reset the counters.
+    """
+    _prediction_cache.clear()
+
+
+class TargetView:
+    """
+    One target of a multi-output forest, exposed with the single-target
+    predict_proba/predict/classes_ API the rest of this module expects.
+    """
+    
+    def __init__(self, model, output_index):
+        self.model = model
+        self.output_index = output_index
+        self.classes_ = model.classes_[output_index]
+    
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)[self.output_index]
+    
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def _load_forest(script_dir, name, engine):
+    """
+    Load one model artifact with the requested engine.
+    
+    Returns:
+        tuple: (model, sha256 of the model pickle)
+    """
+    if engine == 'mmap':
+        # Flat artifacts: no unpickling, pages are shared between processes
+        from forest_engine import CompiledForest
+        model = CompiledForest.load(os.path.join(script_dir, f'{name}.forest'))
+        return model, model.metadata['source_sha256']
+    
+    if engine == 'compact':
+        from forest_engine import CompactForest
+        model = CompactForest.load(os.path.join(script_dir, f'{name}.compact'))
+        return model, model.metadata['source_sha256']
+    
+    with open(os.path.join(script_dir, f'{name}.pkl'), 'rb') as f:
+        data = f.read()
+    model = pickle.loads(data)
+    
+    # Swap in the NumPy engine; it exposes the same predict_proba/classes_ API
+    if engine == 'compiled':
+        from forest_engine import CompiledForest
+        model = CompiledForest.from_sklearn(model)
+    else:
+        # Predictions are made from arrays in FEATURE_COLUMNS order (see
+        # _array_model), so check the training columns once here
+        feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is not None and list(feature_names) != FEATURE_COLUMNS:
+            raise ValueError(f"{name}.pkl was trained on columns {list(feature_names)}, expected {FEATURE_COLUMNS}")
+    
+    return model, hashlib.sha256(data).hexdigest()
+
+
+def _array_model(model):
+    """
+    The model to call with encoded arrays in FEATURE_COLUMNS order.
+    
+    For a forest fitted on a DataFrame this is a shallow copy without
+    feature_names_in_ (sharing the trees), so sklearn does not compare (and
+    warn about) column names on every call. The loaded model itself keeps
+    them, so callers passing DataFrames still get sklearn's column check.
+    """
+    if getattr(model, 'feature_names_in_', None) is None:
+        return model
+    array_model = copy.copy(model)
+    del array_model.feature_names_in_
+    return array_model
+
+
+def load_models(engine=None, layout=None):
     """
     Load both trained models and their metadata.
     Returns a dictionary containing models and configuration.
+    
+    Args:
+        engine: one of ENGINES. None keeps the engine of the models already
+                loaded (DEFAULT_ENGINE on first load).
+        layout: one of LAYOUTS. None keeps the layout of the models already
+                loaded (DEFAULT_LAYOUT on first load).
     """
     global _models_cache
     
-    if _models_cache is not None:
+    if (_models_cache is not None
+            and engine in (None, _models_cache['engine'])
+            and layout in (None, _models_cache['layout'])):
         return _models_cache
     
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Load depression model
-    with open(os.path.join(script_dir, 'depression_model.pkl'), 'rb') as f:
-        depression_model = pickle.load(f)
+    if _models_cache is not None:
+        engine = engine or _models_cache['engine']
+        layout = layout or _models_cache['layout']
+    engine = engine or DEFAULT_ENGINE
+    layout = layout or DEFAULT_LAYOUT
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}")
     
-    # Load suicidal thoughts model
-    with open(os.path.join(script_dir, 'suicidal_model.pkl'), 'rb') as f:
-        suicidal_model = pickle.load(f)
+    start = time.perf_counter()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    multi_output_model = None
     
-    # Load model info from the new separate info files
-    with open(os.path.join(script_dir, 'depression_model_info.pkl'), 'rb') as f:
-        depression_info = pickle.load(f)
+    if layout == 'multi_output':
+        # One forest with an output per target
+        multi_output_model, multi_output_hash = _load_forest(script_dir, 'multi_output_model', engine)
+        depression_model = TargetView(multi_output_model, 0)
+        suicidal_model = TargetView(multi_output_model, 1)
+        model_hashes = [multi_output_hash]
+        
+        array_multi_output_model = _array_model(multi_output_model)
+        array_models = {
+            'depression': TargetView(array_multi_output_model, 0),
+            'suicidal': TargetView(array_multi_output_model, 1),
+            'multi_output': array_multi_output_model
+        }
+        
+        with open(os.path.join(script_dir, 'multi_output_model_info.pkl'), 'rb') as f:
+            multi_output_info = pickle.load(f)
+        depression_info = {
+            'feature_columns': multi_output_info['feature_columns'],
+            'accuracy': multi_output_info['accuracy']['depression']
+        }
+        suicidal_info = {
+            'feature_columns': multi_output_info['feature_columns'],
+            'accuracy': multi_output_info['accuracy']['suicidal']
+        }
+    else:
+        # Load depression model
+        depression_model, depression_hash = _load_forest(script_dir, 'depression_model', engine)
+        
+        # Load suicidal thoughts model
+        suicidal_model, suicidal_hash = _load_forest(script_dir, 'suicidal_model', engine)
+        model_hashes = [depression_hash, suicidal_hash]
+        array_models = {
+            'depression': _array_model(depression_model),
+            'suicidal': _array_model(suicidal_model),
+            'multi_output': None
+        }
+        
+        # Load model info from the new separate info files
+        with open(os.path.join(script_dir, 'depression_model_info.pkl'), 'rb') as f:
+            depression_info = pickle.load(f)
+        
+        with open(os.path.join(script_dir, 'suicidal_model_info.pkl'), 'rb') as f:
+            suicidal_info = pickle.load(f)
     
-    with open(os.path.join(script_dir, 'suicidal_model_info.pkl'), 'rb') as f:
-        suicidal_info = pickle.load(f)
+    # The hashes of the model pickles identify the model version,
+    # whichever format the models were loaded from
+    model_version = hashlib.sha256(''.join(model_hashes).encode()).hexdigest()[:16]
     
     # Create unified model info structure for backward compatibility
     model_info = {
         'depression_features': depression_info['feature_columns'],
         'suicidal_features': suicidal_info['feature_columns'],
-        'encodings': {
-            'Gender': {'Male': 0, 'Female': 1},
-            'Sleep Duration': {
-                'Less than 5 hours': 1,
-                '5-6 hours': 2,
-                '7-8 hours': 3,
-                'More than 8 hours': 4
-            },
-            'Dietary Habits': {'Unhealthy': 1, 'Moderate': 2, 'Healthy': 3},
-            'Have you ever had suicidal thoughts ?': {'No': 0, 'Yes': 1},
-            'Family History of Mental Illness': {'No': 0, 'Yes': 1},
-            'Depression': {'No': 0, 'Yes': 1}
-        },
+        'encodings': ENCODINGS,
         'feature_order': depression_info['feature_columns'],
         'depression_accuracy': depression_info['accuracy'],
         'suicidal_accuracy': suicidal_info['accuracy']
     }
     
+    # Precomputed table, ignored if it was built for other model files
+    lookup_table = None
+    if USE_LOOKUP_TABLE:
+        from lookup_table import RiskLookupTable
+        lookup_table = RiskLookupTable.load(script_dir, model_version)
+    
+    _prediction_cache.invalidate(model_version)
+    
     _models_cache = {
         'depression_model': depression_model,
         'suicidal_model': suicidal_model,
-        'info': model_info
+        'multi_output_model': multi_output_model,
+        # The same models for encoded arrays, used by the predict_* functions
+        'array_models': array_models,
+        'info': model_info,
+        'engine': engine,
+        'layout': layout,
+        'version': model_version,
+        'lookup_table': lookup_table
     }
+    metrics.observe('load_models', time.perf_counter() - start)
     
     return _models_cache
 
@@ -88,46 +395,29 @@ def preprocess_input(gender, age, academic_pressure, study_satisfaction,
     Returns:
         pandas DataFrame with encoded features
     """
-    models = load_models()
-    encodings = models['info']['encodings']
+    import pandas as pd
     
     # Handle gender encoding
     if isinstance(gender, str):
-        gender_encoded = encodings['Gender'].get(gender, 0)
+        gender_encoded = ENCODINGS['Gender'].get(gender, 0)
     else:
         gender_encoded = gender
     
-    # Handle sleep duration encoding
+    # Handle sleep duration encoding (including the short "h" labels)
     if isinstance(sleep_duration, str):
-        # Map common variations
-        sleep_map = {
-            'Less than 5 hours': 1,
-            'Less than 5 h': 1,
-            '5-6 hours': 2,
-            '5-6 h': 2,
-            '7-8 hours': 3,
-            '7-8 h': 3,
-            'More than 8 hours': 4,
-            'More than 8 h': 4
-        }
-        sleep_encoded = sleep_map.get(sleep_duration, 3)  # Default to 7-8 hours
+        sleep_encoded = SLEEP_DURATION_MAP.get(sleep_duration, 3)  # Default to 7-8 hours
     else:
         sleep_encoded = sleep_duration
     
     # Handle dietary habits encoding
     if isinstance(dietary_habits, str):
-        diet_map = {
-            'Unhealthy': 1,
-            'Moderate': 2,
-            'Healthy': 3
-        }
-        diet_encoded = diet_map.get(dietary_habits, 2)  # Default to Moderate
+        diet_encoded = DIETARY_HABITS_MAP.get(dietary_habits, 2)  # Default to Moderate
     else:
         diet_encoded = dietary_habits
     
     # Handle family history encoding
     if isinstance(family_history, str):
-        family_encoded = encodings['Family History of Mental Illness'].get(family_history, 0)
+        family_encoded = ENCODINGS['Family History of Mental Illness'].get(family_history, 0)
     else:
         family_encoded = family_history
     
@@ -147,6 +437,125 @@ def preprocess_input(gender, age, academic_pressure, study_satisfaction,
     return pd.DataFrame([feature_data])
 
 
+def _code(value, table, default):
+    # Text answers go through the table, anything else is used as is (None -> NaN)
+    if isinstance(value, str):
+        return table.get(value, default)
+    return np.nan if value is None else value
+
+
+def encode_row(gender, age, academic_pressure, study_satisfaction,
+               sleep_duration, dietary_habits, study_hours,
+               financial_stress, family_history, out=None):
+    """
+    DataFrame-free version of preprocess_input: the same tables and defaults,
+    written straight into a float32 row in FEATURE_COLUMNS order (the dtype
+    the forests compare in, so the predictions are identical).
+    
+    Args:
+        out: float32 array of len(FEATURE_COLUMNS) to fill, e.g. a row of a
+             preallocated batch buffer; a new row is allocated if None
+    
+    Returns:
+        out
+    """
+    if out is None:
+        out = np.empty(len(FEATURE_COLUMNS), dtype=np.float32)
+    out[:] = (
+        _code(gender, ENCODINGS['Gender'], 0),
+        int(age),
+        float(academic_pressure),
+        float(study_satisfaction),
+        _code(sleep_duration, SLEEP_DURATION_MAP, 3),
+        _code(dietary_habits, DIETARY_HABITS_MAP, 2),
+        int(study_hours),
+        float(financial_stress),
+        _code(family_history, ENCODINGS['Family History of Mental Illness'], 0)
+    )
+    return out
+
+
+def _predict_with_proba(model, X):
+    """
+    Run a single predict_proba pass and derive the labels from it.
+    This is the same rule RandomForestClassifier.predict applies internally,
+    so the labels match model.predict() without walking the forest twice.
+    
+    Returns:
+        tuple: (predictions array, probabilities array)
+    """
+    probabilities = model.predict_proba(X)
+    prediction = model.classes_.take(np.argmax(probabilities, axis=1))
+    return prediction, probabilities
+
+
+def _predict_encoded(models, X):
+    """
+    Labels and class-1 probabilities of both models for encoded rows.
+    Rows inside the lookup table's range are answered from the table; only
+    the remaining rows go through the forests.
+    
+    Args:
+        X: encoded rows, a DataFrame with FEATURE_COLUMNS or an array
+           with the columns in that order
+    
+    Returns:
+        dict of numpy arrays (same keys as predict_both)
+    """
+    if hasattr(X, 'columns'):
+        X = X[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    n_rows = len(X)
+    results = {
+        'depression_prediction': np.zeros(n_rows, dtype=np.int64),
+        'depression_probability': np.zeros(n_rows, dtype=np.float64),
+        'suicidal_prediction': np.zeros(n_rows, dtype=np.int64),
+        'suicidal_probability': np.zeros(n_rows, dtype=np.float64)
+    }
+    remaining = np.ones(n_rows, dtype=bool)
+    
+    lookup_table = models['lookup_table']
+    if lookup_table is not None:
+        in_range, probabilities = lookup_table.lookup(X)
+        for column, target in enumerate(['depression', 'suicidal']):
+            # The table is built so that "> 0.5" reproduces the forest's label
+            results[f'{target}_probability'][in_range] = probabilities[:, column]
+            results[f'{target}_prediction'][in_range] = probabilities[:, column] > 0.5
+        remaining = ~in_range
+        metrics.increment('predictions', int(in_range.sum()), source='lookup')
+    
+    if remaining.any():
+        rows = X if remaining.all() else X[remaining]
+        metrics.increment('predictions', len(rows), source='forest')
+        multi_output_model = models['array_models']['multi_output']
+        if multi_output_model is not None:
+            # One traversal answers both targets
+            outputs = multi_output_model.predict_proba(rows)
+            per_target = [
+                (classes.take(np.argmax(probabilities, axis=1)), probabilities)
+                for classes, probabilities in zip(multi_output_model.classes_, outputs)
+            ]
+        else:
+            per_target = [
+                _predict_with_proba(models['array_models']['depression'], rows),
+                _predict_with_proba(models['array_models']['suicidal'], rows)
+            ]
+        
+        for target, (prediction, probabilities) in zip(['depression', 'suicidal'], per_target):
+            results[f'{target}_prediction'][remaining] = prediction
+            results[f'{target}_probability'][remaining] = probabilities[:, 1]
+    
+    return results
+
+
+def _row_buffer():
+    # predict_both runs in several threads (web app sessions, service
+    # executor), so each thread gets its own preallocated row
+    buffer = getattr(_row_buffers, 'row', None)
+    if buffer is None:
+        buffer = _row_buffers.row = np.empty(len(FEATURE_COLUMNS), dtype=np.float32)
+    return buffer
+
+
 def predict_depression(gender, age, academic_pressure, study_satisfaction,
                        sleep_duration, dietary_habits, study_hours,
                        financial_stress, family_history):
@@ -159,17 +568,16 @@ def predict_depression(gender, age, academic_pressure, study_satisfaction,
     models = load_models()
     
     # Preprocess input
-    input_df = preprocess_input(
+    row = encode_row(
         gender, age, academic_pressure, study_satisfaction,
         sleep_duration, dietary_habits, study_hours,
         financial_stress, family_history
     )
     
     # Make prediction
-    prediction = models['depression_model'].predict(input_df)[0]
-    probabilities = models['depression_model'].predict_proba(input_df)[0]
+    prediction, probabilities = _predict_with_proba(models['array_models']['depression'], row.reshape(1, -1))
     
-    return prediction, probabilities[0], probabilities[1]
+    return prediction[0], probabilities[0, 0], probabilities[0, 1]
 
 
 def predict_suicidal_thoughts(gender, age, academic_pressure, study_satisfaction,
@@ -184,17 +592,16 @@ def predict_suicidal_thoughts(gender, age, academic_pressure, study_satisfaction
     models = load_models()
     
     # Preprocess input
-    input_df = preprocess_input(
+    row = encode_row(
         gender, age, academic_pressure, study_satisfaction,
         sleep_duration, dietary_habits, study_hours,
         financial_stress, family_history
     )
     
     # Make prediction
-    prediction = models['suicidal_model'].predict(input_df)[0]
-    probabilities = models['suicidal_model'].predict_proba(input_df)[0]
+    prediction, probabilities = _predict_with_proba(models['array_models']['suicidal'], row.reshape(1, -1))
     
-    return prediction, probabilities[0], probabilities[1]
+    return prediction[0], probabilities[0, 0], probabilities[0, 1]
 
 
 def predict_both(gender, age, academic_pressure, study_satisfaction,
@@ -210,21 +617,122 @@ def predict_both(gender, age, academic_pressure, study_satisfaction,
             - suicidal_prediction: 0 or 1
             - suicidal_probability: float (0-1)
     """
-    dep_pred, dep_prob_no, dep_prob_yes = predict_depression(
-        gender, age, academic_pressure, study_satisfaction,
-        sleep_duration, dietary_habits, study_hours,
-        financial_stress, family_history
-    )
+    models = load_models()
     
-    sui_pred, sui_prob_no, sui_prob_yes = predict_suicidal_thoughts(
-        gender, age, academic_pressure, study_satisfaction,
-        sleep_duration, dietary_habits, study_hours,
-        financial_stress, family_history
-    )
+    # Encode once into this thread's row buffer and share it between both models
+    with metrics.timed('preprocess'):
+        row = encode_row(
+            gender, age, academic_pressure, study_satisfaction,
+            sleep_duration, dietary_habits, study_hours,
+            financial_stress, family_history, out=_row_buffer()
+        )
+    
+    # Identical answer combinations are served from the cache. Rows with a
+    # missing answer (NaN) are not cached: NaN never equals itself, so their
+    # keys would never match and only fill the cache.
+    cache_key = None if np.isnan(row).any() else tuple(row.tolist())
+    if cache_key is not None:
+        cached = _prediction_cache.get(cache_key)
+        if cached is not None:
+            metrics.increment('predictions', source='cache')
+            return cached
+    
+    with metrics.timed('inference'):
+        results = _predict_encoded(models, row.reshape(1, -1))
+    result = {key: values[0] for key, values in results.items()}
+    if cache_key is not None:
+        _prediction_cache.put(cache_key, result)
+    
+    return result
+
+
+def _encode_categorical(values, table, default):
+    """
+    Encode a column of text answers (or already-encoded numbers) in one pass.
+    Unknown text falls back to the same default as preprocess_input.
+    """
+    import pandas as pd
+    
+    column = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy()
+    
+    is_text = column.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    encoded = column.map(table).to_numpy(dtype=float, na_value=default)
+    if is_text.all():
+        return encoded
+    
+    raw = pd.to_numeric(column.where(~is_text), errors='coerce').to_numpy(dtype=float)
+    return np.where(is_text, encoded, raw)
+
+
+def encode_batch(data):
+    """
+    Vectorized version of preprocess_input for many respondents at once.
+    
+    Args:
+        data: pandas DataFrame or dict of column arrays. Columns may be named
+              after the predict_* arguments (e.g. 'sleep_duration') or after
+              the model features (e.g. 'Sleep Duration').
+    
+    Returns:
+        pandas DataFrame with encoded features, one row per respondent
+    
+    Raises:
+        ValueError: if a numeric answer is missing or not a number
+    """
+    import pandas as pd
+    
+    def column(arg_name):
+        feature = INPUT_COLUMNS[arg_name]
+        if arg_name in data:
+            return data[arg_name]
+        if feature in data:
+            return data[feature]
+        raise KeyError(f"Missing input column '{arg_name}' (or '{feature}')")
+    
+    def numeric(arg_name):
+        values = pd.to_numeric(pd.Series(column(arg_name))).to_numpy(dtype=float)
+        # Checked before the int casts below, which turn NaN into INT64_MIN
+        if np.isnan(values).any():
+            raise ValueError(f"Missing value in numeric column '{arg_name}'")
+        return values
     
-    return {
-        'depression_prediction': dep_pred,
-        'depression_probability': dep_prob_yes,
-        'suicidal_prediction': sui_pred,
-        'suicidal_probability': sui_prob_yes
+    feature_data = {
+        'Gender': _encode_categorical(column('gender'), ENCODINGS['Gender'], 0),
+        'Age': numeric('age').astype(np.int64),
+        'Academic Pressure': numeric('academic_pressure').astype(float),
+        'Study Satisfaction': numeric('study_satisfaction').astype(float),
+        'Sleep Duration': _encode_categorical(column('sleep_duration'), SLEEP_DURATION_MAP, 3),
+        'Dietary Habits': _encode_categorical(column('dietary_habits'), DIETARY_HABITS_MAP, 2),
+        'Study Hours': numeric('study_hours').astype(np.int64),
+        'Financial Stress': numeric('financial_stress').astype(float),
+        'Family History of Mental Illness': _encode_categorical(
+            column('family_history'), ENCODINGS['Family History of Mental Illness'], 0
+        )
     }
+    
+    return pd.DataFrame(feature_data, columns=FEATURE_COLUMNS)
+
+
+def predict_batch(data):
+    """
+    Predict depression and suicidal thoughts risk for many respondents.
+    Encodes all rows in one step and calls predict_proba once per model.
+    
+    Args:
+        data: pandas DataFrame or dict of column arrays (see encode_batch)
+    
+    Returns:
+        dict of numpy arrays aligned with the input rows:
+            - depression_prediction: 0 or 1
+            - depression_probability: float (0-1)
+            - suicidal_prediction: 0 or 1
+            - suicidal_probability: float (0-1)
+    """
+    models = load_models()
+    with metrics.timed('batch_preprocess'):
+        input_df = encode_batch(data)
+    
+    with metrics.timed('batch_inference'):
+        return _predict_encoded(models, input_df)
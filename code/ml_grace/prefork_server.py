@@ -0,0 +1,196 @@
+"""
+Pre-fork multi-process serving of the inference service (Linux/macOS).
+
+The parent loads the models once, freezes every object it allocated with
+gc.freeze() and forks --workers processes that accept connections on one
+shared listening socket. The workers inherit the forests copy-on-write, so N
+workers cost roughly one copy of the models instead of N. Each worker runs
+the micro-batching service from inference_service.py.
+
+The parent prints how much of each worker's memory is still shared with the
+others (from /proc/<pid>/smaps_rollup, Linux only) once the workers are up,
+and again whenever it receives SIGUSR1.
+
+Usage:
+    python prefork_server.py [--workers 4] [--port 8765] [--engine mmap]
+                             [--max-batch-size 64] [--max-wait-ms 5]
+                             [--report-json memory.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+
+import metrics
+import model_utils
+import inference_service
+
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def read_smaps_rollup(pid):
+    """
+    Returns:
+        dict of SMAPS_FIELDS in kB for the process, or None if /proc is
+        not available (non-Linux) or the process has exited
+    """
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    values = {}
+    for line in lines:
+        name, _, rest = line.partition(':')
+        if name in SMAPS_FIELDS:
+            values[name] = int(rest.split()[0])
+    return values
+
+
+def memory_report(parent_pid, worker_pids):
+    """
+    Shared vs. private memory of the parent and every worker, in MB.
+
+    Returns:
+        list of dicts with role, pid, rss_mb, pss_mb, shared_mb and private_mb
+    """
+    rows = []
+    for role, pid in [('parent', parent_pid)] + [(f'worker {i}', pid) for i, pid in enumerate(worker_pids)]:
+        values = read_smaps_rollup(pid)
+        if values is None:
+            continue
+        rows.append({
+            'role': role,
+            'pid': pid,
+            'rss_mb': values['Rss'] / 1024,
+            'pss_mb': values['Pss'] / 1024,
+            'shared_mb': (values['Shared_Clean'] + values['Shared_Dirty']) / 1024,
+            'private_mb': (values['Private_Clean'] + values['Private_Dirty']) / 1024
+        })
+    return rows
+
+
+def print_memory_report(rows):
+    if not rows:
+        print("   (memory report needs /proc/<pid>/smaps_rollup, Linux only)")
+        return
+    print(f"\n   {'Process':<10}{'PID':>8}{'RSS MB':>10}{'PSS MB':>10}{'Shared MB':>11}{'Private MB':>12}")
+    for row in rows:
+        print(f"   {row['role']:<10}{row['pid']:>8}{row['rss_mb']:>10.1f}{row['pss_mb']:>10.1f}"
+              f"{row['shared_mb']:>11.1f}{row['private_mb']:>12.1f}")
+    # PSS splits shared pages between the processes mapping them, so the sum
+    # is the real footprint of the whole server
+    total_pss = sum(row['pss_mb'] for row in rows)
+    total_rss = sum(row['rss_mb'] for row in rows)
+    print(f"   Total PSS {total_pss:.1f} MB (sum of RSS {total_rss:.1f} MB counts shared pages once per process)")
+
+
+def run_worker(sock, args):
+    """
+    Worker body: serve on the inherited socket until terminated.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: os._exit(0))
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    gc.enable()
+    try:
+        asyncio.run(inference_service.serve(
+            max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms, sock=sock
+        ))
+    finally:
+        os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--host', default=inference_service.DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=inference_service.DEFAULT_PORT)
+    parser.add_argument('--max-batch-size', type=int, default=inference_service.DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=inference_service.DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--engine', choices=model_utils.ENGINES)
+    parser.add_argument('--report-json', help='also write the memory report to this file')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit("prefork_server.py needs os.fork (Linux/macOS); use inference_service.py instead")
+
+    print("=" * 70)
+    print("Pre-fork Inference Server")
+    print("=" * 70)
+
+    # Load once in the parent ---------------------------------------------------------------
+    # Collections are paused while loading so the model objects are not moved
+    # around between generations before they are frozen
+    print("\n[1/3] Loading models in the parent...")
+    gc.disable()
+    metrics.enable()
+    models = model_utils.load_models(engine=args.engine)
+    model_utils.predict_both(
+        gender="Male", age=20, academic_pressure=3, study_satisfaction=3,
+        sleep_duration=3, dietary_habits=2, study_hours=5,
+        financial_stress=3, family_history="No"
+    )
+    metrics.reset()
+    gc.collect()
+    gc.freeze()
+    print(f"   ✓ Model version {models['version']} ({models['engine']}), {gc.get_freeze_count():,} objects frozen")
+
+    # Shared socket and workers -------------------------------------------------------------
+    print(f"\n[2/3] Forking {args.workers} workers...")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(1024)
+    sock.setblocking(False)
+
+    worker_pids = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(sock, args)
+        worker_pids.append(pid)
+    print(f"   ✓ Listening on http://{args.host}:{args.port} (workers: {', '.join(map(str, worker_pids))})")
+
+    # Memory report -------------------------------------------------------------------------
+    def report(*_):
+        rows = memory_report(os.getpid(), worker_pids)
+        print_memory_report(rows)
+        if args.report_json and rows:
+            with open(args.report_json, 'w') as f:
+                json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'processes': rows}, f, indent=2)
+        sys.stdout.flush()
+
+    def shutdown(*_):
+        for pid in worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in worker_pids:
+            os.waitpid(pid, 0)
+        sys.exit(0)
+
+    signal.signal(signal.SIGUSR1, report)
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print("\n[3/3] Memory after startup (send SIGUSR1 to the parent to print it again):")
+    time.sleep(1)
+    report()
+
+    # Exit (and stop the others) if a worker dies
+    pid, status = os.wait()
+    print(f"\n✗ Worker {pid} exited with status {status}, shutting down")
+    worker_pids.remove(pid)
+    shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Refresh the trained models with newly collected survey responses.
+
+Instead of retraining both 1000-tree forests, this adds --trees new trees
+fitted on the new responses to the existing depression_model.pkl and
+suicidal_model.pkl. With --mode replace-oldest the same number of oldest
+trees is dropped first, so the forest size stays constant and old data ages
+out on a rolling basis. The cost depends on the new data only.
+
+The previous model files are copied to model_archive/<model version>/
+before the new version is written. Rebuild the lookup table afterwards
+(build_lookup_table.py); until then model_utils ignores the old table.
+
+Usage:
+    python refresh_models.py new_responses.csv [--trees 100]
+                             [--mode append|replace-oldest] [--output-dir DIR]
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+import time
+
+import numpy as np
+
+from dataset import load_encoded_dataset, features_and_target
+from training import MODEL_SPECS, split_dataset, grow_forest, save_model_artifacts
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.join(script_dir, '..', '..', 'data'))
+
+from configs import n_jobs
+
+ARCHIVE_DIRNAME = 'model_archive'
+DEFAULT_NEW_TREES = 100
+MODES = ('append', 'replace-oldest')
+
+
+def model_version(directory):
+    """
+    Version id of the models in a directory (same rule as model_utils.load_models).
+    """
+    hashes = []
+    for spec in MODEL_SPECS.values():
+        with open(os.path.join(directory, spec['model_file']), 'rb') as f:
+            hashes.append(hashlib.sha256(f.read()).hexdigest())
+    return hashlib.sha256(''.join(hashes).encode()).hexdigest()[:16]
+
+
+def archive_models(directory):
+    """
+    Copy the current model files to model_archive/<version>/.
+
+    Returns:
+        the archive directory
+    """
+    archive_dir = os.path.join(directory, ARCHIVE_DIRNAME, model_version(directory))
+    os.makedirs(archive_dir, exist_ok=True)
+    for spec in MODEL_SPECS.values():
+        for filename in [spec['model_file'], spec['info_file']]:
+            shutil.copy2(os.path.join(directory, filename), archive_dir)
+        for dirname in [spec['forest_dir'], spec['compact_dir']]:
+            if os.path.isdir(os.path.join(directory, dirname)):
+                shutil.copytree(os.path.join(directory, dirname), os.path.join(archive_dir, dirname), dirs_exist_ok=True)
+    return archive_dir
+
+
+def refresh_seed(model, X, y):
+    """
+    Random state for the trees added by one refresh, derived from the seeds
+    of the current trees and the new data.
+
+    warm_start draws the new tree seeds after skipping one per existing tree,
+    so with the forest's fixed random_state the trees added after dropping
+    the oldest ones would repeat the seeds of trees still in the forest.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.array([tree.random_state for tree in model.estimators_], dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    return int.from_bytes(digest.digest()[:4], 'little')
+
+
+def refresh_forest(model, X, y, n_new_trees, mode):
+    """
+    Add n_new_trees trees fitted on (X, y), dropping as many of the oldest
+    trees first in 'replace-oldest' mode.
+    """
+    if mode == 'replace-oldest':
+        if n_new_trees >= len(model.estimators_):
+            raise ValueError(f"Cannot replace {n_new_trees} of {len(model.estimators_)} trees")
+        model.estimators_ = model.estimators_[n_new_trees:]
+        model.set_params(n_estimators=len(model.estimators_))
+    model.set_params(random_state=refresh_seed(model, X, y))
+    return grow_forest(model, X, y, n_new_trees, n_jobs=n_jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data', help='CSV with the new responses (same columns as the dataset)')
+    parser.add_argument('--trees', type=int, default=DEFAULT_NEW_TREES, help='trees trained on the new data per model')
+    parser.add_argument('--mode', choices=MODES, default='append')
+    parser.add_argument('--output-dir', default=script_dir, help='directory with the current models')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Incremental Model Refresh")
+    print("=" * 70)
+
+    print("\n[1/4] Loading new responses...")
+    df = load_encoded_dataset(args.data)
+    print(f"   ✓ Loaded {len(df)} records")
+
+    print("\n[2/4] Loading current models...")
+    models = {}
+    for name, spec in MODEL_SPECS.items():
+        with open(os.path.join(args.output_dir, spec['model_file']), 'rb') as f:
+            models[name] = pickle.load(f)
+        print(f"   ✓ {spec['title']}: {len(models[name].estimators_)} trees")
+    previous_version = model_version(args.output_dir)
+    archive_dir = archive_models(args.output_dir)
+    print(f"   ✓ Version {previous_version} archived to '{os.path.relpath(archive_dir, args.output_dir)}/'")
+
+    print(f"\n[3/4] Training {args.trees} new trees per model ({args.mode})...")
+    generated_files = []
+    for name, spec in MODEL_SPECS.items():
+        X, y = features_and_target(df, name)
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
+        if y_train.nunique() < 2:
+            sys.exit(f"✗ The new {spec['title']} training rows contain a single class, not refreshing")
+
+        before = float(np.mean(models[name].predict(X_test) == y_test.to_numpy()))
+        start = time.perf_counter()
+        model = refresh_forest(models[name], X_train, y_train, args.trees, args.mode)
+        elapsed = time.perf_counter() - start
+        accuracy = float(np.mean(model.predict(X_test) == y_test.to_numpy()))
+        print(f"   ✓ {spec['title']}: {len(model.estimators_)} trees, trained in {elapsed:.1f}s")
+        print(f"     Accuracy on held-out new rows: {before * 100:.2f}% -> {accuracy * 100:.2f}%")
+
+        generated_files += save_model_artifacts(
+            model, spec, accuracy, args.output_dir,
+            refreshed_from=previous_version, refresh_mode=args.mode,
+            refresh_trees=args.trees, refresh_rows=len(X_train)
+        )
+
+    print("\n[4/4] New model version...")
+    print(f"   ✓ {previous_version} -> {model_version(args.output_dir)}")
+
+    print("\n" + "=" * 70)
+    print("✓ Models refreshed successfully!")
+    print("=" * 70)
+    print("\nGenerated files:")
+    for filename in generated_files:
+        print(f"  • {filename}")
+    print("\nRun build_lookup_table.py to rebuild the lookup table for the new version.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Score a large survey export in bulk.
+
+The input CSV is read in fixed-size chunks, each chunk is encoded with the
+same mappings as preprocess_input (model_utils.encode_batch) and scored with
+one vectorized call in a pool of worker processes. Results are written in
+input order as soon as they are ready, and only --max-in-flight chunks are
+held at a time, so memory use does not grow with the size of the input.
+
+Columns may be named after the dataset features (e.g. 'Sleep Duration') or
+after the predict_both arguments (e.g. 'sleep_duration'). Rows with a missing
+answer, or a numeric answer that is not a finite number (e.g. Age 'twenty'),
+are kept in the output with empty results and the band 'Invalid'.
+
+Usage:
+    python score_csv.py responses.csv scored.csv [--chunk-size 10000]
+                        [--workers 4] [--max-in-flight 8]
+                        [--engine sklearn|compiled|mmap|compact] [--results-only]
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import model_utils
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Same thresholds as the results page of targetVer/app.py
+DEPRESSION_HIGH_THRESHOLD = 0.65
+DEPRESSION_MODERATE_THRESHOLD = 0.35
+SUICIDAL_THRESHOLD = 0.5
+
+RESULT_COLUMNS = [
+    'depression_probability', 'depression_prediction', 'depression_risk',
+    'suicidal_probability', 'suicidal_prediction', 'suicidal_risk'
+]
+
+
+def input_columns(columns):
+    """
+    Returns:
+        list with the CSV column used for each predict_both argument
+
+    Raises:
+        KeyError: if an argument has no matching column
+    """
+    resolved = []
+    for arg_name, feature in model_utils.INPUT_COLUMNS.items():
+        if arg_name in columns:
+            resolved.append(arg_name)
+        elif feature in columns:
+            resolved.append(feature)
+        else:
+            raise KeyError(f"Missing input column '{arg_name}' (or '{feature}')")
+    return resolved
+
+
+def risk_bands(depression_probability, suicidal_probability):
+    """
+    Returns:
+        tuple of string arrays: (depression band, suicidal band)
+    """
+    depression = np.select(
+        [depression_probability > DEPRESSION_HIGH_THRESHOLD, depression_probability > DEPRESSION_MODERATE_THRESHOLD],
+        ['High', 'Moderate'], default='Low'
+    )
+    suicidal = np.where(suicidal_probability > SUICIDAL_THRESHOLD, 'Detected', 'Low')
+    return depression, suicidal
+
+
+def score_chunk(chunk):
+    """
+    Score one chunk of the input CSV.
+
+    Returns:
+        pandas DataFrame with RESULT_COLUMNS, aligned with the chunk's rows
+    """
+    columns = input_columns(chunk.columns)
+    numeric = [column for arg_name, column in zip(model_utils.INPUT_COLUMNS, columns)
+               if arg_name in model_utils.NUMERIC_INPUTS]
+    # Unparsable numbers count as missing instead of failing the whole run
+    numbers = chunk[numeric].apply(pd.to_numeric, errors='coerce')
+    valid = (chunk[columns].notna().all(axis=1) & np.isfinite(numbers).all(axis=1)).to_numpy()
+
+    scored = pd.DataFrame(index=chunk.index, columns=RESULT_COLUMNS, dtype=object)
+    scored[['depression_risk', 'suicidal_risk']] = 'Invalid'
+    if valid.any():
+        rows = chunk[valid].copy()
+        rows[numeric] = numbers[valid]
+        results = model_utils.predict_batch(rows)
+        depression_risk, suicidal_risk = risk_bands(
+            results['depression_probability'], results['suicidal_probability']
+        )
+        scored.loc[valid, 'depression_probability'] = results['depression_probability']
+        scored.loc[valid, 'depression_prediction'] = results['depression_prediction']
+        scored.loc[valid, 'depression_risk'] = depression_risk
+        scored.loc[valid, 'suicidal_probability'] = results['suicidal_probability']
+        scored.loc[valid, 'suicidal_prediction'] = results['suicidal_prediction']
+        scored.loc[valid, 'suicidal_risk'] = suicidal_risk
+    return scored
+
+
+def _init_worker(engine):
+    # Each worker loads the models once and reuses them for all its chunks
+    model_utils.load_models(engine=engine)
+
+
+def score_csv(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+              max_in_flight=None, engine=None, results_only=False):
+    """
+    Stream input_path through the models into output_path.
+
+    Args:
+        workers: worker processes, 0 scores in this process
+        max_in_flight: chunks read ahead of the writer (default 2 per worker)
+
+    Returns:
+        dict with rows, invalid_rows and chunks
+    """
+    workers = os.cpu_count() if workers is None else workers
+    max_in_flight = max_in_flight or max(2 * workers, 1)
+    totals = {'rows': 0, 'invalid_rows': 0, 'chunks': 0}
+
+    def write(chunk, scored, f):
+        output = scored if results_only else pd.concat([chunk, scored], axis=1)
+        output.to_csv(f, header=totals['chunks'] == 0, index=False, lineterminator='\n')
+        totals['rows'] += len(scored)
+        totals['invalid_rows'] += int((scored['depression_risk'] == 'Invalid').sum())
+        totals['chunks'] += 1
+
+    reader = pd.read_csv(input_path, chunksize=chunk_size)
+    with open(output_path, 'w', newline='') as f:
+        if workers == 0:
+            _init_worker(engine)
+            for chunk in reader:
+                write(chunk, score_chunk(chunk), f)
+            return totals
+
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(engine,)) as pool:
+            # Results are written in input order; reading pauses while
+            # max_in_flight chunks are waiting, which bounds memory use
+            pending = deque()
+            for chunk in reader:
+                pending.append((chunk, pool.submit(score_chunk, chunk)))
+                if len(pending) >= max_in_flight:
+                    chunk, future = pending.popleft()
+                    write(chunk, future.result(), f)
+            while pending:
+                chunk, future = pending.popleft()
+                write(chunk, future.result(), f)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='CSV file with one survey response per row')
+    parser.add_argument('output', help='CSV file to write the scored rows to')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores, 0 = no pool)')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='chunks held in memory at once (default: 2 per worker)')
+    parser.add_argument('--engine', choices=model_utils.ENGINES)
+    parser.add_argument('--results-only', action='store_true', help='write only the result columns, not the input columns')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Bulk Scoring")
+    print("=" * 70)
+    start = time.perf_counter()
+    totals = score_csv(
+        args.input, args.output, args.chunk_size, args.workers,
+        args.max_in_flight, args.engine, args.results_only
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"\n✓ Scored {totals['rows']:,} rows in {totals['chunks']} chunks ({elapsed:.1f}s, {totals['rows'] / elapsed:,.0f} rows/s)")
+    if totals['invalid_rows']:
+        print(f"  {totals['invalid_rows']:,} rows with missing answers were marked 'Invalid'")
+    print(f"✓ Results written to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,29 @@
-import pandas as pd
-import pickle
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
 import sys
+import os
 
 sys.path.insert(1, '../../data')
 
-from configs import data_dir, test_ratio, num_trees
+from configs import test_ratio, num_trees
+from dataset import load_encoded_dataset
+from training import MODEL_SPECS, save_model_artifacts
 
 print("=" * 60)
 print("Training Suicidal Risk Prediction Model")
 print("=" * 60)
 
 # Prepare data --------------------------------------------------------------------------
-# Load the data into a DataFrame
-print("\n[1/5] Loading dataset...")
-df = pd.read_csv(data_dir)
+# Load the data into a DataFrame, with the categorical columns label encoded
+# (dataset.ENCODINGS) and cached in dataset_cache/ after the first load
+print("\n[1/4] Loading dataset...")
+df = load_encoded_dataset()
 print(f"   ✓ Loaded {len(df)} records")
 
-# Convert categorical feature data into numerical data using label encoding
-print("\n[2/5] Encoding categorical features...")
-df['Gender'] = df['Gender'].map({'Male': 0, 'Female': 1})
-df['Sleep Duration'] = df['Sleep Duration'].map({
-    'Less than 5 hours': 1, 
-    '5-6 hours': 2, 
-    '7-8 hours': 3, 
-    'More than 8 hours': 4
-})
-df['Dietary Habits'] = df['Dietary Habits'].map({'Unhealthy': 1, 'Moderate': 2, 'Healthy': 3})
-df['Have you ever had suicidal thoughts ?'] = df['Have you ever had suicidal thoughts ?'].map({'No': 0, 'Yes': 1})
-df['Family History of Mental Illness'] = df['Family History of Mental Illness'].map({'No': 0, 'Yes': 1})
-df['Depression'] = df['Depression'].map({'No': 0, 'Yes': 1})
-print("   ✓ Encoding complete")
-
 # Features: All columns EXCEPT 'Have you ever had suicidal thoughts ?' (target) and 'Depression' (another target)
 # We want to predict suicidal thoughts WITHOUT using depression as a feature
-print("\n[3/5] Preparing features and target...")
+print("\n[2/4] Preparing features and target...")
 feature_columns = [
     'Gender', 'Age', 'Academic Pressure', 'Study Satisfaction',
     'Sleep Duration', 'Dietary Habits', 'Study Hours',
@@ -54,14 +41,14 @@ print(f"   ✓ Train set: {len(X_train)} samples")
 print(f"   ✓ Test set: {len(X_test)} samples")
 
 # Build the model-------------------------------------------------------------------------
-print("\n[4/5] Training Random Forest model...")
+print("\n[3/4] Training Random Forest model...")
 model = RandomForestClassifier(n_estimators=num_trees, random_state=42)
 model.fit(X_train, y_train)
 y_pred = model.predict(X_test)
 print("   ✓ Model trained")
 
 # Evaluate the model----------------------------------------------------------------------
-print("\n[5/5] Evaluating model performance...")
+print("\n[4/4] Evaluating model performance...")
 # Accuracy
 accuracy = accuracy_score(y_test, y_pred)
 print(f'\n   Accuracy: {accuracy * 100:.2f}%')
@@ -78,20 +65,7 @@ print(classification_report(y_test, y_pred, target_names=['No Suicidal Thoughts'
 # Save the model--------------------------------------------------------------------------
 print("\n" + "=" * 60)
 print("Saving model...")
-model_filename = 'suicidal_model.pkl'
-with open(model_filename, 'wb') as f:
-    pickle.dump(model, f)
-print(f"✓ Model saved as '{model_filename}'")
-
-# Save feature information
-model_info = {
-    'feature_columns': feature_columns,
-    'accuracy': accuracy,
-    'model_type': 'suicidal_risk'
-}
-with open('suicidal_model_info.pkl', 'wb') as f:
-    pickle.dump(model_info, f)
-print(f"✓ Model info saved as 'suicidal_model_info.pkl'")
+save_model_artifacts(model, MODEL_SPECS['suicidal'], accuracy)
 
 print("=" * 60)
 print("Suicidal risk model training complete!")
@@ -1,39 +1,63 @@
 """
-Convenience script to train both models at once.
-Run this script to retrain both the depression and suicidal risk models.
+Train both models in a single process.
+The dataset is loaded and encoded once, and each forest is fitted on all CPU
+cores (configs.n_jobs). Writes the same artifacts as depression_model.py and
+suicidal_risk_model.py.
 """
 
-import subprocess
+import os
 import sys
+import time
+
+from joblib import effective_n_jobs
+
+from dataset import load_encoded_dataset, features_and_target
+from training import MODEL_SPECS, split_dataset, fit_forest, print_evaluation, save_model_artifacts
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data'))
+
+from configs import num_trees, n_jobs
 
 print("=" * 70)
 print("Training Both ML Models")
 print("=" * 70)
 
-# Train depression model
-print("\n[1/2] Training Depression Model...")
-print("-" * 70)
-result1 = subprocess.run([sys.executable, "depression_model.py"], capture_output=False)
+# Prepare data (shared by both models) -----------------------------------------------------
+print("\n[1/4] Loading and encoding dataset...")
+df = load_encoded_dataset()
+print(f"   ✓ Loaded {len(df)} records")
 
-if result1.returncode != 0:
-    print("\n❌ Error training depression model")
-    sys.exit(1)
+print("\n[2/4] Preparing features and targets...")
+splits = {}
+for model_name, spec in MODEL_SPECS.items():
+    X, y = features_and_target(df, model_name)
+    splits[model_name] = split_dataset(X, y)
+    X_train, X_test, _, _ = splits[model_name]
+    print(f"   ✓ {spec['title']}: {len(X_train)} train / {len(X_test)} test samples")
 
-# Train suicidal risk model
-print("\n[2/2] Training Suicidal Risk Model...")
-print("-" * 70)
-result2 = subprocess.run([sys.executable, "suicidal_risk_model.py"], capture_output=False)
+# Build the models -------------------------------------------------------------------------
+print(f"\n[3/4] Training Random Forest models ({num_trees} trees, {effective_n_jobs(n_jobs)} cores)...")
+models = {}
+for model_name, spec in MODEL_SPECS.items():
+    X_train, _, y_train, _ = splits[model_name]
+    start = time.perf_counter()
+    models[model_name] = fit_forest(X_train, y_train, n_jobs=n_jobs)
+    print(f"   ✓ {spec['title']} model trained in {time.perf_counter() - start:.1f}s")
 
-if result2.returncode != 0:
-    print("\n❌ Error training suicidal risk model")
-    sys.exit(1)
+# Evaluate and save ------------------------------------------------------------------------
+print("\n[4/4] Evaluating model performance...")
+generated_files = []
+for model_name, spec in MODEL_SPECS.items():
+    _, X_test, _, y_test = splits[model_name]
+    print("\n" + "-" * 70)
+    print(f"{spec['title']} model")
+    accuracy = print_evaluation(models[model_name], X_test, y_test, spec['target_names'])
+    generated_files += save_model_artifacts(models[model_name], spec, accuracy)
 
 print("\n" + "=" * 70)
 print("✓ Both models trained successfully!")
 print("=" * 70)
 print("\nGenerated files:")
-print("  • depression_model.pkl")
-print("  • depression_model_info.pkl")
-print("  • suicidal_model.pkl")
-print("  • suicidal_model_info.pkl")
+for filename in generated_files:
+    print(f"  • {filename}")
 print("\nModels are ready for use in web applications.")
@@ -0,0 +1,65 @@
+"""
+Train a single multi-output Random Forest that predicts both targets.
+Uses the same features, split and forest settings as train_all_models.py, so
+its accuracy can be compared directly (see compare_multi_output.py).
+Serve it with model_utils.load_models(layout='multi_output').
+"""
+
+import os
+import sys
+import time
+
+from dataset import load_encoded_dataset, TARGET_COLUMNS
+from model_utils import FEATURE_COLUMNS, TargetView
+from training import MODEL_SPECS, MULTI_OUTPUT_SPEC, split_dataset, fit_forest, print_evaluation, save_model_artifacts
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data'))
+
+from configs import num_trees, n_jobs
+
+print("=" * 70)
+print("Training Multi-Output Model")
+print("=" * 70)
+
+# Prepare data -----------------------------------------------------------------------------
+print("\n[1/4] Loading and encoding dataset...")
+df = load_encoded_dataset()
+print(f"   ✓ Loaded {len(df)} records")
+
+print("\n[2/4] Preparing features and targets...")
+# Output order matches model_utils: 0 = depression, 1 = suicidal thoughts
+target_names = list(MODEL_SPECS)
+X = df[FEATURE_COLUMNS]
+Y = df[[TARGET_COLUMNS[name] for name in target_names]]
+X_train, X_test, Y_train, Y_test = split_dataset(X, Y)
+print(f"   ✓ Targets: {', '.join(Y.columns)}")
+print(f"   ✓ Train set: {len(X_train)} samples")
+print(f"   ✓ Test set: {len(X_test)} samples")
+
+# Build the model --------------------------------------------------------------------------
+print(f"\n[3/4] Training multi-output Random Forest ({num_trees} trees)...")
+start = time.perf_counter()
+model = fit_forest(X_train, Y_train, n_jobs=n_jobs)
+print(f"   ✓ Model trained in {time.perf_counter() - start:.1f}s")
+
+# Evaluate and save ------------------------------------------------------------------------
+print("\n[4/4] Evaluating model performance...")
+accuracy = {}
+for index, name in enumerate(target_names):
+    spec = MODEL_SPECS[name]
+    print("\n" + "-" * 70)
+    print(f"{spec['title']} output")
+    accuracy[name] = print_evaluation(
+        TargetView(model, index), X_test, Y_test.iloc[:, index], spec['target_names']
+    )
+
+print("\n" + "=" * 70)
+print("Saving model...")
+generated_files = save_model_artifacts(model, MULTI_OUTPUT_SPEC, accuracy, targets=target_names)
+
+print("=" * 70)
+print("Multi-output model training complete!")
+print("=" * 70)
+print("\nGenerated files:")
+for filename in generated_files:
+    print(f"  • {filename}")
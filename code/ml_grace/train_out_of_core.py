@@ -0,0 +1,177 @@
+"""
+Train both models on a dataset larger than memory.
+
+The CSV is streamed in chunks of --chunk-size rows. Each chunk adds
+--trees-per-chunk trees to both forests (warm_start), fitted on that chunk's
+training rows only, so peak memory depends on the chunk size and not on the
+size of the dataset. A second streamed pass measures test accuracy on the
+held-out rows of every chunk. Chunks where a target has a single class are
+skipped for that model.
+
+With --compare the same split is also trained in memory with fit_forest, to
+show how much accuracy the chunked training gives up (only for datasets that
+still fit in memory).
+
+Usage:
+    python train_out_of_core.py [--data path.csv] [--chunk-size 50000]
+                                [--trees-per-chunk N] [--compare]
+                                [--output-dir DIR] [--no-save]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from dataset import DEFAULT_DATA_PATH, TARGET_COLUMNS, iter_encoded_chunks
+from model_utils import FEATURE_COLUMNS
+from training import MODEL_SPECS, grow_forest, chunk_test_mask, fit_forest, save_model_artifacts
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.join(script_dir, '..', '..', 'data'))
+
+from configs import num_trees, n_jobs
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def count_rows(path):
+    """
+    Data rows in a CSV file, counted without parsing it.
+    """
+    with open(path, 'rb') as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def split_chunk(chunk_index, chunk):
+    test = chunk_test_mask(chunk_index, len(chunk))
+    return chunk[~test], chunk[test]
+
+
+def train_chunked(path, chunk_size, trees_per_chunk):
+    """
+    Returns:
+        dict: model name -> (RandomForestClassifier, chunks used, chunks skipped)
+    """
+    models = {name: None for name in MODEL_SPECS}
+    used = {name: 0 for name in MODEL_SPECS}
+    skipped = {name: 0 for name in MODEL_SPECS}
+
+    for chunk_index, chunk in enumerate(iter_encoded_chunks(path, chunk_size)):
+        train, _ = split_chunk(chunk_index, chunk)
+        for name in MODEL_SPECS:
+            y = train[TARGET_COLUMNS[name]]
+            if y.nunique() < 2:
+                skipped[name] += 1
+                continue
+            models[name] = grow_forest(models[name], train[FEATURE_COLUMNS], y, trees_per_chunk, n_jobs=n_jobs)
+            used[name] += 1
+        print(f"   ✓ Chunk {chunk_index + 1}: {len(train)} training rows")
+
+    return {name: (models[name], used[name], skipped[name]) for name in MODEL_SPECS}
+
+
+def evaluate_chunked(models, path, chunk_size):
+    """
+    Test accuracy of each model over the held-out rows of every chunk.
+    """
+    correct = {name: 0 for name in models}
+    total = 0
+    for chunk_index, chunk in enumerate(iter_encoded_chunks(path, chunk_size)):
+        _, test = split_chunk(chunk_index, chunk)
+        if test.empty:
+            continue
+        total += len(test)
+        for name, model in models.items():
+            y_pred = model.predict(test[FEATURE_COLUMNS])
+            correct[name] += int(np.sum(y_pred == test[TARGET_COLUMNS[name]].to_numpy()))
+    return {name: correct[name] / total for name in models}, total
+
+
+def train_in_memory(path, chunk_size):
+    """
+    Reference: fit_forest on all training rows at once (same split).
+    """
+    import pandas as pd
+
+    chunks = list(iter_encoded_chunks(path, chunk_size))
+    train = pd.concat([split_chunk(i, chunk)[0] for i, chunk in enumerate(chunks)])
+    test = pd.concat([split_chunk(i, chunk)[1] for i, chunk in enumerate(chunks)])
+    accuracy = {}
+    for name in MODEL_SPECS:
+        model = fit_forest(train[FEATURE_COLUMNS], train[TARGET_COLUMNS[name]], n_jobs=n_jobs)
+        y_pred = model.predict(test[FEATURE_COLUMNS])
+        accuracy[name] = float(np.mean(y_pred == test[TARGET_COLUMNS[name]].to_numpy()))
+    return accuracy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help='dataset CSV (default: configs.data_dir)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--trees-per-chunk', type=int, help=f'default: spread {num_trees} trees over the chunks')
+    parser.add_argument('--compare', action='store_true', help='also train in memory and compare accuracy')
+    parser.add_argument('--output-dir', default=script_dir)
+    parser.add_argument('--no-save', action='store_true', help='do not write the model files')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Out-of-Core Training")
+    print("=" * 70)
+
+    print("\n[1/4] Scanning dataset...")
+    n_rows = count_rows(args.data)
+    n_chunks = max(math.ceil(n_rows / args.chunk_size), 1)
+    trees_per_chunk = args.trees_per_chunk or max(math.ceil(num_trees / n_chunks), 1)
+    print(f"   ✓ {n_rows:,} rows -> {n_chunks} chunks of up to {args.chunk_size:,} rows")
+    print(f"   ✓ {trees_per_chunk} trees per chunk")
+
+    print("\n[2/4] Training on streamed chunks...")
+    start = time.perf_counter()
+    trained = train_chunked(args.data, args.chunk_size, trees_per_chunk)
+    print(f"   ✓ Done in {time.perf_counter() - start:.1f}s")
+    for name, (model, used, skipped) in trained.items():
+        if model is None:
+            sys.exit(f"✗ No chunk had both classes for '{name}', cannot train it")
+        note = f", {skipped} single-class chunks skipped" if skipped else ""
+        print(f"   ✓ {MODEL_SPECS[name]['title']}: {len(model.estimators_)} trees from {used} chunks{note}")
+
+    print("\n[3/4] Evaluating on the held-out rows...")
+    models = {name: model for name, (model, _, _) in trained.items()}
+    accuracy, n_test = evaluate_chunked(models, args.data, args.chunk_size)
+    for name in models:
+        print(f"   ✓ {MODEL_SPECS[name]['title']}: {accuracy[name] * 100:.2f}% ({n_test:,} test rows)")
+
+    if args.compare:
+        print("\n   In-memory training on the same split:")
+        reference = train_in_memory(args.data, args.chunk_size)
+        print(f"\n   {'Model':<20}{'In memory':>12}{'Chunked':>12}{'Change':>10}")
+        for name in models:
+            change = (accuracy[name] - reference[name]) * 100
+            print(f"   {MODEL_SPECS[name]['title']:<20}{reference[name] * 100:>11.2f}%"
+                  f"{accuracy[name] * 100:>11.2f}%{change:>+9.2f}pp")
+
+    print("\n[4/4] Saving models...")
+    if args.no_save:
+        print("   (skipped, --no-save)")
+        return
+    generated_files = []
+    for name, model in models.items():
+        generated_files += save_model_artifacts(
+            model, MODEL_SPECS[name], accuracy[name], args.output_dir,
+            training='out_of_core', chunk_size=args.chunk_size, trees_per_chunk=trees_per_chunk
+        )
+
+    print("\n" + "=" * 70)
+    print("✓ Both models trained successfully!")
+    print("=" * 70)
+    print("\nGenerated files:")
+    for filename in generated_files:
+        print(f"  • {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Shared training, evaluation and export steps for the Random Forest models.
+Used by train_all_models.py and the other training tools so every model is
+fitted, reported and saved the same way.
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+
+import numpy as np
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
+
+from forest_engine import CompiledForest
+from model_utils import FEATURE_COLUMNS
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.join(script_dir, '..', '..', 'data'))
+
+from configs import test_ratio, num_trees
+
+# Model name -> display and artifact settings
+MODEL_SPECS = {
+    'depression': {
+        'title': 'Depression',
+        'target_names': ['No Depression', 'Depression'],
+        'model_type': 'depression',
+        'model_file': 'depression_model.pkl',
+        'forest_dir': 'depression_model.forest',
+        'compact_dir': 'depression_model.compact',
+        'info_file': 'depression_model_info.pkl'
+    },
+    'suicidal': {
+        'title': 'Suicidal Thoughts',
+        'target_names': ['No Suicidal Thoughts', 'Suicidal Thoughts'],
+        'model_type': 'suicidal_risk',
+        'model_file': 'suicidal_model.pkl',
+        'forest_dir': 'suicidal_model.forest',
+        'compact_dir': 'suicidal_model.compact',
+        'info_file': 'suicidal_model_info.pkl'
+    }
+}
+
+# One forest predicting both targets (model_utils layout='multi_output')
+MULTI_OUTPUT_SPEC = {
+    'title': 'Multi-output (Depression + Suicidal Thoughts)',
+    'model_type': 'multi_output',
+    'model_file': 'multi_output_model.pkl',
+    'forest_dir': 'multi_output_model.forest',
+    'compact_dir': 'multi_output_model.compact',
+    'info_file': 'multi_output_model_info.pkl'
+}
+
+
+def split_dataset(X, y):
+    """
+    Train/test split used by every training script (same ratio and seed).
+    """
+    return train_test_split(X, y, test_size=test_ratio, random_state=42)
+
+
+def fit_forest(X_train, y_train, n_estimators=num_trees, n_jobs=None, **params):
+    """
+    Fit a RandomForestClassifier with the project defaults.
+    n_jobs only parallelizes the fit: the returned model is reset to the
+    default single-threaded prediction, so it is identical to one trained
+    with n_jobs=None.
+    """
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=n_jobs, **params)
+    model.fit(X_train, y_train)
+    model.set_params(n_jobs=None)
+    return model
+
+
+def grow_forest(model, X, y, n_new_trees, n_jobs=None, **params):
+    """
+    Add n_new_trees trees fitted on (X, y) to a forest with warm_start.
+    The existing trees are kept unchanged, so the cost only depends on the
+    new data. With model=None a new forest is started.
+    
+    Returns:
+        the grown RandomForestClassifier (the same object when model is given)
+    """
+    if model is None:
+        model = RandomForestClassifier(n_estimators=0, random_state=42, **params)
+    n_trees = len(getattr(model, 'estimators_', []))
+    model.set_params(n_estimators=n_trees + n_new_trees, warm_start=True, n_jobs=n_jobs)
+    model.fit(X, y)
+    model.set_params(warm_start=False, n_jobs=None)
+    return model
+
+
+def chunk_test_mask(chunk_index, n_rows):
+    """
+    Deterministic test-row mask for one chunk of a streamed dataset, holding
+    out test_ratio of the rows. The same chunk always gets the same mask, so
+    training and evaluation passes (and in-memory comparisons) agree.
+    """
+    rng = np.random.default_rng([42, chunk_index])
+    return rng.random(n_rows) < test_ratio
+
+
+def print_evaluation(model, X_test, y_test, target_names):
+    """
+    Print accuracy, confusion matrix and classification report.
+    
+    Returns:
+        float: accuracy on the test set
+    """
+    y_pred = model.predict(X_test)
+    
+    accuracy = accuracy_score(y_test, y_pred)
+    print(f'\n   Accuracy: {accuracy * 100:.2f}%')
+    
+    conf_matrix = confusion_matrix(y_test, y_pred)
+    print(f'\n   Confusion Matrix:')
+    print(f'   {conf_matrix}')
+    
+    print(f'\n   Classification Report:')
+    print(classification_report(y_test, y_pred, target_names=target_names))
+    
+    return accuracy
+
+
+def save_model_artifacts(model, spec, accuracy, directory=script_dir, **extra_info):
+    """
+    Write the pickle, the flat .forest copy and the info file of one model.
+    
+    Args:
+        spec: entry of MODEL_SPECS (or MULTI_OUTPUT_SPEC)
+        extra_info: additional fields stored in the info file
+    
+    Returns:
+        list of written file names
+    """
+    model_bytes = pickle.dumps(model)
+    with open(os.path.join(directory, spec['model_file']), 'wb') as f:
+        f.write(model_bytes)
+    print(f"✓ Model saved as '{spec['model_file']}'")
+    
+    # Flat, memory-mappable copy of the same forest (model_utils engine='mmap')
+    CompiledForest.from_sklearn(model).save(
+        os.path.join(directory, spec['forest_dir']),
+        model_type=spec['model_type'],
+        accuracy=accuracy,
+        source_sha256=hashlib.sha256(model_bytes).hexdigest()
+    )
+    print(f"✓ Flat model saved as '{spec['forest_dir']}/'")
+    
+    # A compact copy of the previous model would be served as this version
+    compact_dir = os.path.join(directory, spec['compact_dir'])
+    if os.path.isdir(compact_dir):
+        shutil.rmtree(compact_dir)
+        print(f"✓ Removed outdated '{spec['compact_dir']}/' (run compact_models.py to rebuild it)")
+    
+    model_info = {
+        'feature_columns': FEATURE_COLUMNS,
+        'accuracy': accuracy,
+        'model_type': spec['model_type'],
+        **extra_info
+    }
+    with open(os.path.join(directory, spec['info_file']), 'wb') as f:
+        pickle.dump(model_info, f)
+    print(f"✓ Model info saved as '{spec['info_file']}'")
+    
+    return [spec['model_file'], spec['forest_dir'] + '/', spec['info_file']]
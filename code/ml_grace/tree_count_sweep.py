@@ -0,0 +1,172 @@
+"""
+Accuracy vs. latency sweep over the number of trees, with automatic pruning.
+Trains each forest once with configs.num_trees trees, then evaluates prefixes
+of it (the first 10, 25, 50 ... trees): test accuracy, how far the
+probabilities move from the full forest, and single-request latency.
+The smallest prefix whose accuracy is within the tolerance of the full
+forest is saved as the pruned model, together with the trade-off table.
+
+Usage:
+    python tree_count_sweep.py [--model depression|suicidal|all]
+                               [--tolerance 0.01] [--max-mean-deviation 0.02]
+                               [--install]
+"""
+
+import argparse
+import copy
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+from dataset import load_encoded_dataset, features_and_target
+from forest_engine import CompiledForest
+from training import MODEL_SPECS, split_dataset, fit_forest, save_model_artifacts
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.join(script_dir, '..', '..', 'data'))
+
+from configs import num_trees, n_jobs, prune_accuracy_tolerance
+
+DEFAULT_TREE_COUNTS = [10, 25, 50, 100, 200, 300, 500, 750, 1000]
+PRUNED_DIR = os.path.join(script_dir, 'pruned_models')
+
+
+def truncate_forest(model, n_trees):
+    """
+    A copy of a fitted forest that keeps only its first n_trees trees.
+    The trees are shared with the original, not copied.
+    """
+    pruned = copy.copy(model)
+    pruned.estimators_ = model.estimators_[:n_trees]
+    pruned.n_estimators = n_trees
+    return pruned
+
+
+def median_latency_ms(predict, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def sweep(model, X_test, y_test, tree_counts, repeats):
+    """
+    Evaluate every prefix of the forest.
+    
+    Returns:
+        list of dict rows, one per tree count
+    """
+    full_proba = model.predict_proba(X_test)[:, 1]
+    X_single = X_test.iloc[:1]
+    rows = []
+    for n_trees in tree_counts:
+        pruned = truncate_forest(model, n_trees)
+        compiled = CompiledForest.from_sklearn(pruned)
+        proba = compiled.predict_proba(X_test)
+        y_pred = pruned.classes_.take(np.argmax(proba, axis=1))
+        deviation = np.abs(proba[:, 1] - full_proba)
+        rows.append({
+            'n_trees': n_trees,
+            'accuracy': float(np.mean(y_pred == y_test.to_numpy())),
+            'mean_proba_deviation': float(deviation.mean()),
+            'max_proba_deviation': float(deviation.max()),
+            'label_agreement': float(np.mean((proba[:, 1] > proba[:, 0]) == (full_proba > 0.5))),
+            'sklearn_latency_ms': median_latency_ms(pruned.predict_proba, X_single, repeats),
+            'compiled_latency_ms': median_latency_ms(compiled.predict_proba, X_single, repeats)
+        })
+    return rows
+
+
+def choose_tree_count(rows, tolerance, max_mean_deviation=None):
+    """
+    Smallest tree count whose accuracy is within tolerance of the full forest
+    (and, optionally, whose probabilities stay close to the full forest's).
+    """
+    full_accuracy = rows[-1]['accuracy']
+    for row in rows:
+        if row['accuracy'] < full_accuracy - tolerance:
+            continue
+        if max_mean_deviation is not None and row['mean_proba_deviation'] > max_mean_deviation:
+            continue
+        return row['n_trees']
+    return rows[-1]['n_trees']
+
+
+def write_table(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', choices=list(MODEL_SPECS) + ['all'], default='all')
+    parser.add_argument('--tolerance', type=float, default=prune_accuracy_tolerance,
+                        help='accepted accuracy loss vs. the full forest (0.01 = 1 point)')
+    parser.add_argument('--max-mean-deviation', type=float, default=None,
+                        help='also require the mean probability change vs. the full forest to stay below this')
+    parser.add_argument('--tree-counts', type=int, nargs='+', default=DEFAULT_TREE_COUNTS)
+    parser.add_argument('--repeats', type=int, default=30, help='timed single-row predictions per tree count')
+    parser.add_argument('--install', action='store_true',
+                        help='write the pruned models over the served ones instead of pruned_models/')
+    args = parser.parse_args()
+
+    output_dir = script_dir if args.install else PRUNED_DIR
+    os.makedirs(PRUNED_DIR, exist_ok=True)
+    tree_counts = sorted({n for n in args.tree_counts if n < num_trees} | {num_trees})
+    model_names = list(MODEL_SPECS) if args.model == 'all' else [args.model]
+
+    print("=" * 70)
+    print("Tree Count Sweep")
+    print("=" * 70)
+
+    print("\n[1/3] Loading and encoding dataset...")
+    df = load_encoded_dataset()
+    print(f"   ✓ Loaded {len(df)} records")
+
+    for model_name in model_names:
+        spec = MODEL_SPECS[model_name]
+        X, y = features_and_target(df, model_name)
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
+
+        print("\n" + "-" * 70)
+        print(f"\n[2/3] Training {spec['title']} model ({num_trees} trees)...")
+        model = fit_forest(X_train, y_train, n_jobs=n_jobs)
+
+        print("\n[3/3] Evaluating forest prefixes...")
+        rows = sweep(model, X_test, y_test, tree_counts, args.repeats)
+        print(f"\n   {'Trees':>6} {'Accuracy':>9} {'Mean |Δp|':>10} {'Max |Δp|':>9} "
+              f"{'Same label':>11} {'sklearn ms':>11} {'compiled ms':>12}")
+        for row in rows:
+            print(f"   {row['n_trees']:>6} {row['accuracy'] * 100:>8.2f}% {row['mean_proba_deviation']:>10.4f} "
+                  f"{row['max_proba_deviation']:>9.4f} {row['label_agreement'] * 100:>10.1f}% "
+                  f"{row['sklearn_latency_ms']:>11.2f} {row['compiled_latency_ms']:>12.2f}")
+
+        table_path = os.path.join(PRUNED_DIR, f'{model_name}_tree_sweep.csv')
+        write_table(rows, table_path)
+        print(f"\n   ✓ Trade-off table saved as '{os.path.relpath(table_path, script_dir)}'")
+
+        best = choose_tree_count(rows, args.tolerance, args.max_mean_deviation)
+        chosen = next(row for row in rows if row['n_trees'] == best)
+        print(f"   ✓ Smallest forest within {args.tolerance * 100:.1f} accuracy points: "
+              f"{best} trees ({chosen['accuracy'] * 100:.2f}% vs {rows[-1]['accuracy'] * 100:.2f}%)")
+
+        print(f"\nSaving pruned {spec['title']} model to '{os.path.relpath(output_dir, script_dir) or '.'}'...")
+        save_model_artifacts(
+            truncate_forest(model, best), spec, chosen['accuracy'], directory=output_dir,
+            n_estimators=best, pruned_from=num_trees
+        )
+
+    print("\n" + "=" * 70)
+    print("✓ Sweep complete!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Cross-validated hyperparameter search for both models.
+
+Searches max_depth, min_samples_leaf, max_features and the number of trees
+with stratified k-fold CV on the training split. The (parameters, fold) fits
+run in parallel on all cores (configs.n_jobs). Each fit grows the largest
+forest once and every smaller tree count is scored from its first trees,
+like tree_count_sweep.py.
+
+Fold assignments and the per-fit accuracies are cached in tuning/cache/,
+keyed on the encoded dataset and the training split, so a rerun only fits
+new parameter combinations. Candidates within --tolerance of the best CV
+accuracy are then timed (single-row predict_proba, cached per machine) and
+ranked by latency. The fastest one is recommended and checked on the test split
+against the current defaults.
+
+Usage:
+    python tune_hyperparameters.py [--model depression|suicidal|all] [--folds 5]
+                                   [--max-depth none 8 16] [--min-samples-leaf 1 5 20]
+                                   [--max-features sqrt 0.5 1.0]
+                                   [--tree-counts 50 100 250 500 1000]
+                                   [--tolerance 0.01] [--repeats 30]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold
+
+from dataset import encoded_dataset_key, load_encoded_dataset, features_and_target
+from forest_engine import CompiledForest
+from training import MODEL_SPECS, split_dataset, fit_forest
+from tree_count_sweep import truncate_forest, median_latency_ms, write_table
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.join(script_dir, '..', '..', 'data'))
+
+from configs import num_trees, n_jobs, prune_accuracy_tolerance
+
+TUNING_DIR = os.path.join(script_dir, 'tuning')
+CACHE_DIR = os.path.join(TUNING_DIR, 'cache')
+CACHE_FORMAT = 'tuning-v1'
+
+DEFAULT_FOLDS = 5
+DEFAULT_MAX_DEPTHS = [None, 8, 16]
+DEFAULT_MIN_SAMPLES_LEAF = [1, 5, 20]
+DEFAULT_MAX_FEATURES = ['sqrt', 0.5, 1.0]
+DEFAULT_TREE_COUNTS = [50, 100, 250, 500, 1000]
+
+
+def parse_max_depth(value):
+    return None if value.lower() == 'none' else int(value)
+
+
+def parse_max_features(value):
+    if value.lower() == 'none':
+        return None
+    if value in ('sqrt', 'log2'):
+        return value
+    return float(value) if '.' in value else int(value)
+
+
+def param_grid(max_depths, min_samples_leafs, max_features):
+    return [
+        {'max_depth': depth, 'min_samples_leaf': leaf, 'max_features': features}
+        for depth, leaf, features in itertools.product(max_depths, min_samples_leafs, max_features)
+    ]
+
+
+def describe(params):
+    return ', '.join(f'{name}={value}' for name, value in params.items())
+
+
+def _cache_path(cache_dir, kind, extension, *parts):
+    # Cached results are only valid for the same sklearn version
+    key = json.dumps([CACHE_FORMAT, sklearn.__version__, *parts], sort_keys=True)
+    return os.path.join(cache_dir, f'{kind}-{hashlib.sha256(key.encode()).hexdigest()[:16]}.{extension}')
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    # Workers write concurrently, so every file gets its own temporary name
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def training_key(X, y):
+    """
+    Hash of the training rows, part of every cache key so cached folds and
+    fits are not reused after the train/test split changes (configs.test_ratio).
+    """
+    digest = hashlib.sha256(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def fold_assignment(y, n_folds, cache_dir, key):
+    """
+    Stratified fold index of every training row, cached on disk.
+    """
+    path = _cache_path(cache_dir, 'folds', 'npy', key, n_folds)
+    if os.path.exists(path):
+        return np.load(path)
+
+    folds = np.empty(len(y), dtype=np.int64)
+    splitter = StratifiedKFold(n_folds, shuffle=True, random_state=42)
+    for fold, (_, val_index) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        folds[val_index] = fold
+    tmp_path = f'{path}.{os.getpid()}.tmp.npy'
+    np.save(tmp_path, folds)
+    os.replace(tmp_path, path)
+    return folds
+
+
+def prefix_accuracy(model, X, y):
+    """
+    Accuracy of the first 1, 2, ... n trees of a forest on (X, y), from one
+    pass over the trees (sequential sums, as in predict_proba).
+    """
+    compiled = CompiledForest.from_sklearn(model)
+    leaves = compiled.apply(X)
+    totals = np.cumsum(compiled.value[leaves][:, :, 0, :], axis=1)
+    y_pred = model.classes_.take(np.argmax(totals, axis=2))
+    return (y_pred == y[:, np.newaxis]).mean(axis=0)
+
+
+def _fit_fold(X, y, folds, fold, params, n_trees, path):
+    start = time.perf_counter()
+    train = folds != fold
+    model = fit_forest(X[train], y[train], n_estimators=n_trees, **params)
+    result = {
+        'params': params,
+        'fold': fold,
+        'accuracy': prefix_accuracy(model, X[~train], y[~train]).tolist(),
+        'n_nodes': np.cumsum([tree.tree_.node_count for tree in model.estimators_]).tolist(),
+        'fit_seconds': time.perf_counter() - start
+    }
+    _write_json(path, result)
+    return result
+
+
+def cross_validate(X, y, grid, folds, n_trees, cache_dir, key, n_jobs=None):
+    """
+    Fit every (parameters, fold) pair that is not cached yet, in parallel.
+
+    Returns:
+        tuple: (list of per-fold results for each grid entry, fits run)
+    """
+    n_folds = int(folds.max()) + 1
+    paths = [
+        [_cache_path(cache_dir, 'fit', 'json', key, n_folds, fold, params, n_trees) for fold in range(n_folds)]
+        for params in grid
+    ]
+    missing = [
+        (params, fold, paths[i][fold])
+        for i, params in enumerate(grid) for fold in range(n_folds)
+        if _read_json(paths[i][fold]) is None
+    ]
+    Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(X, y, folds, fold, params, n_trees, path) for params, fold, path in missing
+    )
+    return [[_read_json(path) for path in fold_paths] for fold_paths in paths], len(missing)
+
+
+def summarize(grid, fold_results, tree_counts):
+    """
+    One candidate per (parameters, tree count) with its mean CV accuracy.
+    """
+    candidates = []
+    for params, results in zip(grid, fold_results):
+        for n_trees in tree_counts:
+            accuracy = np.array([result['accuracy'][n_trees - 1] for result in results])
+            candidates.append({
+                **params,
+                'n_estimators': n_trees,
+                'cv_accuracy': float(accuracy.mean()),
+                'cv_accuracy_std': float(accuracy.std()),
+                'n_nodes': int(np.mean([result['n_nodes'][n_trees - 1] for result in results])),
+                'sklearn_latency_ms': None,
+                'compiled_latency_ms': None
+            })
+    candidates.sort(key=lambda c: (-c['cv_accuracy'], c['n_nodes']))
+    return candidates
+
+
+def machine():
+    return f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs"
+
+
+def measure_latency(candidates, X, y, folds, cache_dir, key, repeats):
+    """
+    Fill in the single-row latency of the given candidates. Forests are
+    refitted on the first fold's training rows (once per parameter
+    combination, with the largest tree count needed); timings are cached
+    per machine.
+    """
+    by_params = {}
+    for candidate in candidates:
+        params = {name: candidate[name] for name in ('max_depth', 'min_samples_leaf', 'max_features')}
+        by_params.setdefault(json.dumps(params), (params, []))[1].append(candidate)
+
+    train = folds != 0
+    X_single = X[:1]
+    for params, group in by_params.values():
+        missing = []
+        for candidate in group:
+            path = _cache_path(cache_dir, 'latency', 'json', key, machine(), params, candidate['n_estimators'], repeats)
+            cached = _read_json(path)
+            if cached is None:
+                missing.append((candidate, path))
+            else:
+                candidate.update(cached)
+        if not missing:
+            continue
+
+        model = fit_forest(X[train], y[train], n_estimators=max(c['n_estimators'] for c, _ in missing), **params)
+        for candidate, path in missing:
+            pruned = truncate_forest(model, candidate['n_estimators'])
+            timings = {
+                'sklearn_latency_ms': median_latency_ms(pruned.predict_proba, X_single, repeats),
+                'compiled_latency_ms': median_latency_ms(CompiledForest.from_sklearn(pruned).predict_proba, X_single, repeats)
+            }
+            _write_json(path, timings)
+            candidate.update(timings)
+
+
+def print_candidates(candidates):
+    print(f"   {'max_depth':>9} {'leaf':>5} {'features':>8} {'trees':>6} {'CV accuracy':>14} "
+          f"{'nodes':>8} {'sklearn ms':>11} {'compiled ms':>12}")
+    for c in candidates:
+        latency = (f"{c['sklearn_latency_ms']:>11.2f} {c['compiled_latency_ms']:>12.2f}"
+                   if c['sklearn_latency_ms'] is not None else f"{'-':>11} {'-':>12}")
+        print(f"   {str(c['max_depth']):>9} {c['min_samples_leaf']:>5} {str(c['max_features']):>8} "
+              f"{c['n_estimators']:>6} {c['cv_accuracy'] * 100:>7.2f}% ±{c['cv_accuracy_std'] * 100:>4.1f} "
+              f"{c['n_nodes']:>8} {latency}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', choices=list(MODEL_SPECS) + ['all'], default='all')
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--max-depth', type=parse_max_depth, nargs='+', default=DEFAULT_MAX_DEPTHS)
+    parser.add_argument('--min-samples-leaf', type=int, nargs='+', default=DEFAULT_MIN_SAMPLES_LEAF)
+    parser.add_argument('--max-features', type=parse_max_features, nargs='+', default=DEFAULT_MAX_FEATURES)
+    parser.add_argument('--tree-counts', type=int, nargs='+', default=DEFAULT_TREE_COUNTS)
+    parser.add_argument('--tolerance', type=float, default=prune_accuracy_tolerance,
+                        help='CV accuracy loss vs. the best candidate accepted for a faster model')
+    parser.add_argument('--repeats', type=int, default=30, help='timed single-row predictions per candidate')
+    parser.add_argument('--top', type=int, default=10, help='candidates listed by accuracy')
+    args = parser.parse_args()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    grid = param_grid(args.max_depth, args.min_samples_leaf, args.max_features)
+    tree_counts = sorted(set(args.tree_counts))
+    model_names = list(MODEL_SPECS) if args.model == 'all' else [args.model]
+
+    print("=" * 70)
+    print("Hyperparameter Search")
+    print("=" * 70)
+
+    print("\n[1/4] Loading and encoding dataset...")
+    df = load_encoded_dataset()
+    dataset_key = encoded_dataset_key()
+    print(f"   ✓ Loaded {len(df)} records (dataset {dataset_key})")
+    print(f"   ✓ {len(grid)} parameter combinations x {len(tree_counts)} tree counts, {args.folds}-fold CV")
+
+    for model_name in model_names:
+        spec = MODEL_SPECS[model_name]
+        X, y = features_and_target(df, model_name)
+        X_train, X_test, y_train, y_test = split_dataset(X.to_numpy(dtype=np.float64), y.to_numpy())
+        key = [dataset_key, model_name, training_key(X_train, y_train)]
+
+        print("\n" + "-" * 70)
+        print(f"\n[2/4] Cross-validating {spec['title']} model...")
+        start = time.perf_counter()
+        folds = fold_assignment(y_train, args.folds, CACHE_DIR, key)
+        fold_results, n_fitted = cross_validate(
+            X_train, y_train, grid, folds, max(tree_counts), CACHE_DIR, key, n_jobs=n_jobs
+        )
+        n_total = len(grid) * args.folds
+        print(f"   ✓ {n_fitted} fits run, {n_total - n_fitted} from cache ({time.perf_counter() - start:.1f}s)")
+
+        candidates = summarize(grid, fold_results, tree_counts)
+        print(f"\n   Top {args.top} by CV accuracy:")
+        print_candidates(candidates[:args.top])
+
+        print(f"\n[3/4] Timing candidates within {args.tolerance * 100:.1f} points of the best...")
+        best_accuracy = candidates[0]['cv_accuracy']
+        close = [c for c in candidates if c['cv_accuracy'] >= best_accuracy - args.tolerance]
+        measure_latency(close, X_train, y_train, folds, CACHE_DIR, key, args.repeats)
+        close.sort(key=lambda c: (c['sklearn_latency_ms'], -c['cv_accuracy']))
+        print(f"\n   {len(close)} candidates by latency:")
+        print_candidates(close[:args.top])
+
+        table_path = os.path.join(TUNING_DIR, f'{model_name}_tuning.csv')
+        write_table(candidates, table_path)
+        print(f"\n   ✓ All candidates saved as '{os.path.relpath(table_path, script_dir)}'")
+
+        print("\n[4/4] Checking the fastest candidate on the test split...")
+        chosen = close[0]
+        chosen_params = {name: chosen[name] for name in ('max_depth', 'min_samples_leaf', 'max_features')}
+        for label, n_trees, params in [('Current defaults', num_trees, {}),
+                                       ('Recommended', chosen['n_estimators'], chosen_params)]:
+            model = fit_forest(X_train, y_train, n_estimators=n_trees, n_jobs=n_jobs, **params)
+            accuracy = float(np.mean(model.predict(X_test) == y_test))
+            latency = median_latency_ms(model.predict_proba, X_test[:1], args.repeats)
+            print(f"   ✓ {label + ':':<18} {accuracy * 100:.2f}% test accuracy, {latency:.2f} ms/request, "
+                  f"{n_trees} trees ({describe(params) or 'sklearn defaults'})")
+
+    print("\n" + "=" * 70)
+    print("✓ Search complete!")
+    print("=" * 70)
+    print("\nPass the recommended parameters to training.fit_forest to train with them.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,55 @@ import os
 
 # Add ml_grace directory to path to import model utilities
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ml_grace')))
-from model_utils import predict_both
+from model_utils import predict_both, predict_batch
+from inference_client import INFERENCE_URL, InferenceClient
+
+# Client mode: score through inference_service.py instead of loading the models here
+if INFERENCE_URL:
+    predict_both = InferenceClient(INFERENCE_URL).predict_both
+
+# Queued, batched scoring: clicks waiting in the queue are scored together with one
+# predict_batch call, up to this many at a time (0 scores every click on its own)
+MAX_BATCH_SIZE = int(os.environ.get("DEPRESSION_ANALYZER_GRADIO_BATCH_SIZE", "0"))
+
+# Number of analyze calls (single or batched) allowed to run at the same time
+CONCURRENCY_LIMIT = int(os.environ.get("DEPRESSION_ANALYZER_GRADIO_CONCURRENCY", "1"))
+
+# "public" keeps the shareable gradio.live link; "local" only listens on
+# 127.0.0.1 without a share link (internal deployments and load tests)
+LAUNCH_PROFILE = os.environ.get("DEPRESSION_ANALYZER_LAUNCH_PROFILE", "public")
+
+# Resources Text
+RESOURCES_MD = """
+    ### Help Resources
+    
+    If you feel overwhelmed, please seek professional help.
+    
+    *   **Suicide Prevention Lifeline:** 988 (USA) / [Your local number]
+    *   **Student Health Services:** Contact your university counseling center.
+    *   **Emergency:** Call 911 or go to the nearest hospital.
+    """
+
+def format_result(dep_prob, sui_prob):
+    """
+    Turn both probabilities into the text shown in the results label.
+    """
+    # Format depression result
+    if dep_prob >= 0.65:
+        dep_result = f"Depression Risk: HIGH ({dep_prob:.1%})"
+    elif dep_prob >= 0.35:
+        dep_result = f"Depression Risk: MODERATE ({dep_prob:.1%})"
+    else:
+        dep_result = f"Depression Risk: LOW ({dep_prob:.1%})"
+    
+    # Format suicidal thoughts result
+    if sui_prob >= 0.5:
+        suicide_result = f"Suicidal Thoughts Risk: DETECTED ({sui_prob:.1%})"
+    else:
+        suicide_result = f"Suicidal Thoughts Risk: LOW ({sui_prob:.1%})"
+    
+    # Combine results
+    return f"{dep_result}\n{suicide_result}"
 
 def analyze_risk(
     gender, age, academic_pressure, study_satisfaction, 
@@ -28,40 +76,59 @@ def analyze_risk(
             family_history=family_history
         )
         
-        # Format depression result
-        dep_prob = predictions['depression_probability']
-        if dep_prob >= 0.65:
-            dep_result = f"Depression Risk: HIGH ({dep_prob:.1%})"
-        elif dep_prob >= 0.35:
-            dep_result = f"Depression Risk: MODERATE ({dep_prob:.1%})"
-        else:
-            dep_result = f"Depression Risk: LOW ({dep_prob:.1%})"
-        
-        # Format suicidal thoughts result
-        sui_prob = predictions['suicidal_probability']
-        if sui_prob >= 0.5:
-            suicide_result = f"Suicidal Thoughts Risk: DETECTED ({sui_prob:.1%})"
-        else:
-            suicide_result = f"Suicidal Thoughts Risk: LOW ({sui_prob:.1%})"
-        
-        # Combine results
-        final_text = f"{dep_result}\n{suicide_result}"
+        final_text = format_result(predictions['depression_probability'], predictions['suicidal_probability'])
         
     except Exception as e:
         final_text = f"Error: Unable to process prediction. {str(e)}"
-
-    # Resources Text
-    resources_md = """
-    ### Help Resources
-    
-    If you feel overwhelmed, please seek professional help.
     
-    *   **Suicide Prevention Lifeline:** 988 (USA) / [Your local number]
-    *   **Student Health Services:** Contact your university counseling center.
-    *   **Emergency:** Call 911 or go to the nearest hospital.
+    return final_text, RESOURCES_MD
+
+def analyze_risk_batch(
+    gender, age, academic_pressure, study_satisfaction, 
+    study_hours, sleep_duration, dietary_habits, 
+    family_history, financial_stress
+):
+    """
+    Batched version of analyze_risk for Gradio's batch=True mode: every
+    argument is a list with one entry per queued click, and one list per
+    output is returned.
     """
+    columns = {
+        'gender': gender,
+        'age': age,
+        'academic_pressure': academic_pressure,
+        'study_satisfaction': study_satisfaction,
+        'sleep_duration': sleep_duration,
+        'dietary_habits': dietary_habits,
+        'study_hours': study_hours,
+        'financial_stress': financial_stress,
+        'family_history': family_history
+    }
     
-    return final_text, resources_md
+    # Unanswered fields arrive as None and make analyze_risk report an error,
+    # so incomplete batches (and client mode, where the inference service
+    # batches by itself) are scored row by row
+    complete = all(value is not None for values in columns.values() for value in values)
+    if complete and not INFERENCE_URL:
+        try:
+            predictions = predict_batch(columns)
+        except ValueError as e:
+            # An answer encode_batch cannot use (e.g. a non-numeric age);
+            # row by row scoring reports it for that click only
+            print(f"Batch scoring failed, scoring {len(gender)} requests one by one: {e}")
+        else:
+            texts = [
+                format_result(dep_prob, sui_prob)
+                for dep_prob, sui_prob in zip(predictions['depression_probability'], predictions['suicidal_probability'])
+            ]
+            return texts, [RESOURCES_MD] * len(texts)
+    
+    outputs = [analyze_risk(*row) for row in zip(
+        gender, age, academic_pressure, study_satisfaction,
+        study_hours, sleep_duration, dietary_habits,
+        family_history, financial_stress
+    )]
+    return [text for text, _ in outputs], [resources for _, resources in outputs]
 
 
 # UI Layout
@@ -110,15 +177,32 @@ with gr.Blocks() as demo:
             resources_output = gr.Markdown(label="Resources")
 
             
-    analyze_btn.click(
-        fn=analyze_risk,
-        inputs=[
-            gender, age, academic_pressure, study_satisfaction, 
-            study_hours, sleep_duration, dietary_habits, 
-            family_history, financial_stress
-        ],
-        outputs=[result_label, resources_output]
-    )
+    analyze_inputs = [
+        gender, age, academic_pressure, study_satisfaction, 
+        study_hours, sleep_duration, dietary_habits, 
+        family_history, financial_stress
+    ]
+    if MAX_BATCH_SIZE > 0:
+        analyze_btn.click(
+            fn=analyze_risk_batch,
+            inputs=analyze_inputs,
+            outputs=[result_label, resources_output],
+            batch=True,
+            max_batch_size=MAX_BATCH_SIZE,
+            concurrency_limit=CONCURRENCY_LIMIT
+        )
+    else:
+        analyze_btn.click(
+            fn=analyze_risk,
+            inputs=analyze_inputs,
+            outputs=[result_label, resources_output],
+            concurrency_limit=CONCURRENCY_LIMIT
+        )
 
 if __name__ == "__main__":
-    demo.launch(theme=gr.themes.Default(primary_hue="red", secondary_hue="pink"), share=True)
+    theme = gr.themes.Default(primary_hue="red", secondary_hue="pink")
+    demo.queue()
+    if LAUNCH_PROFILE == "local":
+        demo.launch(theme=theme, server_name="127.0.0.1", share=False)
+    else:
+        demo.launch(theme=theme, share=True)
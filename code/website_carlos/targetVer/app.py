@@ -1,8 +1,6 @@
 import streamlit as st
+import threading
 import time
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
 import sys
 import os
 
@@ -14,6 +12,17 @@ from adviceModule_Esin.advice import generate_advice_for_symptom
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ml_grace')))
 from model_utils import predict_both
 from model_utils import load_models
+import metrics
+from cohort_stats import get_cohort_stats
+from inference_client import INFERENCE_URL, InferenceClient
+
+# Client mode: score through inference_service.py instead of loading the models here
+if INFERENCE_URL:
+    predict_both = InferenceClient(INFERENCE_URL).predict_both
+
+# Optional artificial delay (seconds) while the results are "analyzed", for UX
+# demos only. Off by default so server threads only spend time on real inference.
+RESULT_DELAY_SECONDS = float(os.environ.get("DEPRESSION_ANALYZER_RESULT_DELAY", "0"))
 
 
 # Page Config
@@ -48,6 +57,38 @@ def load_ml_models():
     """Cache the model loading to avoid reloading on every interaction"""
     return load_models()
 
+@st.cache_data(max_entries=4096, show_spinner=False)
+def cached_predict_both(**answers):
+    """
+    predict_both, cached across sessions on the answers. Failed predictions
+    raise and are therefore never cached.
+    """
+    return predict_both(**answers)
+
+def _warm_up_models():
+    """Load the models, cohort statistics and run one prediction so step 4 only pays for inference"""
+    try:
+        get_cohort_stats()
+        if not INFERENCE_URL:
+            load_models()
+        predict_both(
+            gender="Male", age=20, academic_pressure=3, study_satisfaction=3,
+            sleep_duration=3, dietary_habits=2, study_hours=5,
+            financial_stress=3, family_history="No"
+        )
+    except Exception as e:
+        print(f"Model warm-up error: {e}")
+
+@st.cache_resource
+def start_model_warmup():
+    """Start the warm-up in a background thread, once per server process"""
+    thread = threading.Thread(target=_warm_up_models, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+# Models load in the background while the user fills in steps 1-3
+start_model_warmup()
+
 def predict_outcomes(data):
     """
     Use trained ML models to predict depression and suicidal thoughts risk.
@@ -58,14 +99,19 @@ def predict_outcomes(data):
         - suicide_prob (float): Probability of Suicidal Thoughts
         - suicide_label (str)
     """
-    time.sleep(2)  # Simulate processing time for UX
+    if RESULT_DELAY_SECONDS > 0:
+        time.sleep(RESULT_DELAY_SECONDS)  # Simulate processing time for UX
     
     try:
-        # Load models (cached)
-        load_ml_models()
+        # Wait for the background warm-up instead of loading the models twice
+        start_model_warmup().join()
         
-        # Get predictions from ML models
-        predictions = predict_both(
+        # Load models (cached), unless the inference service holds them
+        if not INFERENCE_URL:
+            load_ml_models()
+        
+        # Get predictions from ML models (cached per answer combination)
+        predictions = cached_predict_both(
             gender=data.get('gender', 'Male'),
             age=data.get('age', 20),
             academic_pressure=data.get('academic_pressure', 3),
@@ -106,10 +152,12 @@ def predict_outcomes(data):
         
     return dep_prob, dep_label, dep_color, suicide_prob, suicide_label
 
+@st.cache_data(max_entries=4096, show_spinner=False)
 def get_advice_data(data):
     """
     Maps app data to advice module format.
     Returns a dictionary of symptoms and their advice.
+    Cached on the survey answers.
     """
     advice_results = {}
     
@@ -142,6 +190,74 @@ def get_advice_data(data):
         
     return advice_results
 
+# --- Dashboard Figures ---
+# Both charts only depend on a few discrete values, so the figures are cached
+# and identical dashboards skip building the plotly objects. They are cached
+# as go.Figure objects shared by all sessions (st.cache_resource): st.plotly_chart
+# re-validates a dict (or an unpickled st.cache_data copy) as a new Figure on
+# every rerun, which costs more than building the figure, while a Figure is
+# only converted to JSON. st.plotly_chart does not modify the figure.
+@st.cache_resource(max_entries=1024, show_spinner=False)
+def gauge_figure(dep_prob, dep_label, dep_color):
+    """Depression risk gauge as a plotly figure (shared, do not modify)"""
+    import plotly.graph_objects as go
+    
+    fig_gauge = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = dep_prob * 100,
+        number = {'suffix': "%"},
+        title = {'text': f"Level: <span style='color:{dep_color}'>{dep_label}</span>", 'font': {'size': 20}},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': dep_color},
+            'steps': [
+                {'range': [0, 35], 'color': "rgba(76, 175, 80, 0.3)"},
+                {'range': [35, 65], 'color': "rgba(255, 152, 0, 0.3)"},
+                {'range': [65, 100], 'color': "rgba(244, 67, 54, 0.3)"}],
+            'threshold': {
+                'line': {'color': "black", 'width': 4},
+                'thickness': 0.75,
+                'value': dep_prob * 100}}))
+    
+    fig_gauge.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+    return fig_gauge
+
+@st.cache_resource(max_entries=1024, show_spinner=False)
+def radar_figure(categories, user_vals, avg_vals):
+    """You vs. average radar chart as a plotly figure (tuples as arguments, shared, do not modify)"""
+    import plotly.graph_objects as go
+    
+    fig_radar = go.Figure()
+    
+    fig_radar.add_trace(go.Scatterpolar(
+        r=list(avg_vals),
+        theta=list(categories),
+        fill='toself',
+        name='Average',
+        line_color='gray',
+        opacity=0.5
+    ))
+    
+    fig_radar.add_trace(go.Scatterpolar(
+        r=list(user_vals),
+        theta=list(categories),
+        fill='toself',
+        name='You',
+        line_color='#4ecdc4'
+    ))
+    
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 5]
+            )),
+        showlegend=True,
+        height=350,
+        margin=dict(l=40, r=40, t=20, b=20)
+    )
+    return fig_radar
+
 # --- Navigation Functions ---
 def next_step():
     st.session_state.step += 1
@@ -287,18 +403,20 @@ elif st.session_state.step == 3:
 # ---------------- STEP 4: DASHBOARD DE RESULTADOS ----------------
 elif st.session_state.step == 4:
     # Full width for results
+    # plotly is imported lazily by the figure functions, keeping steps 1-3 fast on cold start
     
     # Simulation of processing
     if 'processed' not in st.session_state:
         with st.spinner("🔄 Analyzing patterns in your responses..."):
             dep_prob, dep_label, dep_color, suicide_prob, suicide_label = predict_outcomes(st.session_state.data)
+            with metrics.timed('advice'):
+                advice_data = get_advice_data(st.session_state.data)
             st.session_state.result = {
                 "dep_prob": dep_prob, "dep_label": dep_label, "dep_color": dep_color,
                 "suicide_prob": suicide_prob, "suicide_label": suicide_label,
-                "advice_data": get_advice_data(st.session_state.data)
+                "advice_data": advice_data
             }
             st.session_state.processed = True
-            time.sleep(0.5) # Extra smooth feel
             st.rerun()
     
     # Retrieve results
@@ -324,25 +442,8 @@ elif st.session_state.step == 4:
     with col_gauge:
         st.subheader("Depression Risk")
         # Gauge Chart
-        fig_gauge = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = dep_prob * 100,
-            number = {'suffix': "%"},
-            title = {'text': f"Level: <span style='color:{dep_color}'>{dep_label}</span>", 'font': {'size': 20}},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': dep_color},
-                'steps': [
-                    {'range': [0, 35], 'color': "rgba(76, 175, 80, 0.3)"},
-                    {'range': [35, 65], 'color': "rgba(255, 152, 0, 0.3)"},
-                    {'range': [65, 100], 'color': "rgba(244, 67, 54, 0.3)"}],
-                'threshold': {
-                    'line': {'color': "black", 'width': 4},
-                    'thickness': 0.75,
-                    'value': dep_prob * 100}}))
-        
-        fig_gauge.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        with metrics.timed('plotly_gauge'):
+            st.plotly_chart(gauge_figure(dep_prob, dep_label, dep_color), use_container_width=True)
         
         # Suicidal Thoughts Indicator
         st.markdown("---")
@@ -370,50 +471,31 @@ elif st.session_state.step == 4:
         st.subheader("You vs. Average Student")
         
         # Prepare Data for Radar
-        categories = ['Acad. Pressure', 'Satisfaction', 'Fin. Stress', 'Sleep Quality', 'Diet']
+        radar_fields = {
+            'academic_pressure': 'Acad. Pressure',
+            'study_satisfaction': 'Satisfaction',
+            'financial_stress': 'Fin. Stress',
+            'sleep_quality': 'Sleep Quality',
+            'diet_quality': 'Diet'
+        }
+        categories = list(radar_fields.values())
         
         # Normalize user values to 0-5 scale roughly for visualization
-        user_vals = [
-            st.session_state.data['academic_pressure'],
-            st.session_state.data['study_satisfaction'],
-            st.session_state.data['financial_stress'],
-            st.session_state.data['sleep_quality'],
-            st.session_state.data['diet_quality']
-        ]
-        
-        # Mock Average Data (Static for now)
-        avg_vals = [3.0, 3.5, 2.5, 3.5, 3.0]
-        
-        fig_radar = go.Figure()
+        user_vals = [st.session_state.data[field] for field in radar_fields]
         
-        fig_radar.add_trace(go.Scatterpolar(
-            r=avg_vals,
-            theta=categories,
-            fill='toself',
-            name='Average',
-            line_color='gray',
-            opacity=0.5
-        ))
+        # Real cohort averages from the dataset (precomputed, see cohort_stats.py)
+        cohort = get_cohort_stats()
+        avg_vals = [round(cohort.mean(field), 2) for field in radar_fields]
         
-        fig_radar.add_trace(go.Scatterpolar(
-            r=user_vals,
-            theta=categories,
-            fill='toself',
-            name='You',
-            line_color='#4ecdc4'
-        ))
+        with metrics.timed('plotly_radar'):
+            fig_radar = radar_figure(tuple(categories), tuple(user_vals), tuple(avg_vals))
+            st.plotly_chart(fig_radar, use_container_width=True)
         
-        fig_radar.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 5]
-                )),
-            showlegend=True,
-            height=350,
-            margin=dict(l=40, r=40, t=20, b=20)
-        )
-        st.plotly_chart(fig_radar, use_container_width=True)
+        percentiles = [
+            f"{label}: {cohort.percentile(field, st.session_state.data[field]):.0f}th"
+            for field, label in radar_fields.items()
+        ]
+        st.caption("Your percentile among students in the dataset — " + " · ".join(percentiles))
 
     st.markdown("---")
     
@@ -483,6 +565,9 @@ elif st.session_state.step == 4:
                 st.write(f"**Advice:** {advice}")
                 st.progress(min(100, int(score * 10)))
 
+    # Refresh the metrics file (no-op unless DEPRESSION_ANALYZER_METRICS_FILE is set)
+    metrics.dump()
+
     st.markdown("---")
     if st.button("🔄 Start New Survey"):
         # Clear all survey-related session state keys
@@ -4,4 +4,6 @@ Contains configuration information for easy access and updating
 
 data_dir = './../../data/Depression Student Dataset.csv'
 test_ratio = 0.3
-num_trees = 1000
\ No newline at end of file
+num_trees = 1000
+n_jobs = -1  # CPU cores used to fit the forests (-1 = all cores)
+prune_accuracy_tolerance = 0.01  # tree_count_sweep.py: max accuracy loss accepted when pruning
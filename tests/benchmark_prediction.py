@@ -0,0 +1,224 @@
+"""
+Benchmark suite for the prediction stack.
+Measures load_models (cold and warm), preprocess_input, encode_row, predict_both latency
+percentiles, predict_batch throughput and peak memory, writes the numbers as
+JSON and compares them against the committed baseline.
+
+Usage:
+    python tests/benchmark_prediction.py [--engine sklearn|compiled|mmap|compact]
+                                         [--lookup] [--threshold 0.25]
+                                         [--output results.json] [--update-baseline]
+
+Exits with status 1 when a metric regresses by more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import model_utils
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), 'benchmark_results.json')
+BATCH_SIZES = [1, 10, 100, 1000]
+
+SAMPLE_INPUT = dict(
+    gender="Female", age=22, academic_pressure=3, study_satisfaction=4,
+    sleep_duration="7-8 hours", dietary_habits="Healthy", study_hours=6,
+    financial_stress=2, family_history="No"
+)
+
+# Run in fresh interpreters: import + first load_models time, and its peak traced memory
+COLD_LOAD_SCRIPT = """
+import sys, time
+sys.path.insert(0, {ml_dir!r})
+start = time.perf_counter()
+import model_utils
+model_utils.USE_LOOKUP_TABLE = {lookup!r}
+model_utils.load_models(engine={engine!r})
+print(time.perf_counter() - start)
+"""
+LOAD_MEMORY_SCRIPT = """
+import sys, tracemalloc
+sys.path.insert(0, {ml_dir!r})
+tracemalloc.start()
+import model_utils
+model_utils.USE_LOOKUP_TABLE = {lookup!r}
+model_utils.load_models(engine={engine!r})
+print(tracemalloc.get_traced_memory()[1])
+"""
+
+
+def run_script(template, engine, lookup):
+    script = template.format(ml_dir=ML_DIR, engine=engine, lookup=lookup)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def timings_ms(function, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings[i] = time.perf_counter() - start
+    return timings * 1000
+
+
+def random_batch(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        'gender': rng.choice(['Male', 'Female'], n_rows),
+        'age': rng.integers(18, 35, n_rows),
+        'academic_pressure': rng.integers(1, 6, n_rows),
+        'study_satisfaction': rng.integers(1, 6, n_rows),
+        'sleep_duration': rng.choice(list(model_utils.ENCODINGS['Sleep Duration']), n_rows),
+        'dietary_habits': rng.choice(list(model_utils.DIETARY_HABITS_MAP), n_rows),
+        'study_hours': rng.integers(0, 13, n_rows),
+        'financial_stress': rng.integers(1, 6, n_rows),
+        'family_history': rng.choice(['Yes', 'No'], n_rows)
+    }
+
+
+def run_benchmarks(engine, lookup, repeats):
+    """
+    Returns:
+        dict of metric name -> {'value', 'unit', 'better'}
+    """
+    metrics = {}
+
+    def record(name, value, unit, better='lower'):
+        metrics[name] = {'value': float(value), 'unit': unit, 'better': better}
+        print(f"   {name:<34} {value:>12.3f} {unit}")
+
+    print("\n[1/5] load_models...")
+    cold = [run_script(COLD_LOAD_SCRIPT, engine, lookup) for _ in range(3)]
+    record('load_models_cold_ms', np.median(cold) * 1000, 'ms')
+    record('load_models_peak_memory_mb', run_script(LOAD_MEMORY_SCRIPT, engine, lookup) / 1e6, 'MB')
+
+    model_utils.USE_LOOKUP_TABLE = lookup
+    model_utils.load_models(engine=engine)
+    # A cached call is too fast to time individually, so average a tight loop
+    start = time.perf_counter()
+    for _ in range(100000):
+        model_utils.load_models()
+    record('load_models_warm_us', (time.perf_counter() - start) * 10, 'us')
+
+    print("\n[2/5] preprocess_input / encode_row...")
+    record('preprocess_input_us', np.median(timings_ms(lambda: model_utils.preprocess_input(**SAMPLE_INPUT), repeats)) * 1000, 'us')
+    row = np.empty(len(model_utils.FEATURE_COLUMNS), dtype=np.float32)
+    record('encode_row_us', np.median(timings_ms(lambda: model_utils.encode_row(**SAMPLE_INPUT, out=row), repeats)) * 1000, 'us')
+
+    print("\n[3/5] predict_both (cache disabled)...")
+    model_utils.configure_prediction_cache(0)
+    latencies = timings_ms(lambda: model_utils.predict_both(**SAMPLE_INPUT), repeats)
+    for percentile in [50, 95, 99]:
+        record(f'predict_both_p{percentile}_ms', np.percentile(latencies, percentile), 'ms')
+
+    print("\n[4/5] predict_batch throughput...")
+    for batch_size in BATCH_SIZES:
+        batch = random_batch(batch_size)
+        runs = max(3, min(repeats, 2000 // batch_size))
+        seconds = np.median(timings_ms(lambda: model_utils.predict_batch(batch), runs)) / 1000
+        record(f'predict_batch_{batch_size}_rows_per_s', batch_size / seconds, 'rows/s', better='higher')
+
+    print("\n[5/5] Peak memory of a 1000-row batch...")
+    batch = random_batch(1000)
+    tracemalloc.start()
+    model_utils.predict_batch(batch)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    record('predict_batch_1000_peak_memory_mb', peak / 1e6, 'MB')
+
+    return metrics
+
+
+def compare(metrics, baseline, threshold):
+    """
+    Print the change of every metric vs. the baseline.
+
+    Returns:
+        list of regressed metric names
+    """
+    regressions = []
+    print(f"\n   {'Metric':<34} {'Baseline':>12} {'Current':>12} {'Change':>8}")
+    for name, metric in metrics.items():
+        if name not in baseline:
+            print(f"   {name:<34} {'-':>12} {metric['value']:>12.3f}      new")
+            continue
+        before = baseline[name]['value']
+        change = (metric['value'] - before) / before if before else 0.0
+        worse = change > threshold if metric['better'] == 'lower' else change < -threshold
+        flag = "  ✗" if worse else ""
+        print(f"   {name:<34} {before:>12.3f} {metric['value']:>12.3f} {change * 100:>+7.1f}%{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engine', choices=model_utils.ENGINES, default=model_utils.DEFAULT_ENGINE)
+    parser.add_argument('--lookup', action='store_true', help='serve in-range requests from the lookup table')
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--threshold', type=float, default=0.25, help='relative change counted as a regression')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+
+    config = f"{args.engine}{'+lookup' if args.lookup else ''}"
+    print("=" * 70)
+    print(f"Prediction Benchmarks ({config})")
+    print("=" * 70)
+
+    metrics = run_benchmarks(args.engine, args.lookup, args.repeats)
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': config,
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        'model_version': model_utils.load_models()['version'],
+        'metrics': metrics
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to '{args.output}'")
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baselines = json.load(f)
+
+    if args.update_baseline:
+        baselines[config] = results
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baselines, f, indent=2)
+        print(f"✓ Baseline for '{config}' updated")
+        return
+
+    if config not in baselines:
+        print(f"\nNo baseline for '{config}' yet, run with --update-baseline to store one.")
+        return
+
+    print("\n" + "-" * 70)
+    print(f"Comparison with baseline from {baselines[config]['timestamp']} ({baselines[config]['machine']})")
+    regressions = compare(metrics, baselines[config]['metrics'], args.threshold)
+
+    print("\n" + "=" * 70)
+    if regressions:
+        print(f"✗ Regressions over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print("✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Import-time report for the app entry points.
+Runs each import in a fresh interpreter with `python -X importtime`, parses
+the timings and compares them against the startup budget below.
+
+Usage:
+    python tests/import_time_report.py [--output report.json] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CODE_DIR = os.path.join(ROOT, 'code')
+ML_DIR = os.path.join(CODE_DIR, 'ml_grace')
+
+# Module -> cumulative import budget in milliseconds.
+# The budgeted entries are what the apps import at startup. Modules with a
+# budget of None are only imported lazily (plotly on the results step, sklearn
+# through the pickles) and are reported for tracking only.
+IMPORT_BUDGET_MS = {
+    'model_utils': 500,
+    'adviceModule_Esin.advice': 50,
+    'forest_engine': 400,
+    'streamlit': 2500,
+    'gradio': 6000,
+    'plotly.graph_objects': None,
+    'sklearn.ensemble': None,
+}
+
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter and parse its -X importtime output.
+
+    Returns:
+        dict with total_ms and the direct imports it pulled in (the module's
+        own body counts as one entry), or None if the module is not installed
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ML_DIR, CODE_DIR, env.get('PYTHONPATH', '')])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        return None
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package".
+    # Children are printed before their parent, one indent level deeper.
+    target_names = {module} | {module.rsplit('.', i)[0] for i in range(1, module.count('.') + 1)}
+    total_ms = 0.0
+    children = []
+    pending = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entry = {
+            'name': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        }
+        if depth == 1:
+            pending.append(entry)
+        elif depth == 0:
+            # Skip interpreter startup imports (site, encodings, ...)
+            if entry['name'] in target_names:
+                total_ms += entry['cumulative_ms']
+                children.extend(pending + [dict(entry, cumulative_ms=entry['self_ms'])])
+            pending = []
+
+    return {
+        'total_ms': total_ms,
+        'imports': sorted(children, key=lambda entry: entry['cumulative_ms'], reverse=True)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    parser.add_argument('--top', type=int, default=5, help='heaviest imports to list per module')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Import Time Report")
+    print("=" * 70)
+
+    report = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0], 'modules': {}}
+    over_budget = []
+
+    for module, budget_ms in IMPORT_BUDGET_MS.items():
+        measured = measure_import(module)
+        if measured is None:
+            print(f"\n{module}: not installed, skipped")
+            report['modules'][module] = {'budget_ms': budget_ms, 'installed': False}
+            continue
+
+        if budget_ms is None:
+            status = "(lazy import, not budgeted)"
+        elif measured['total_ms'] <= budget_ms:
+            status = f"(budget {budget_ms} ms) ✓"
+        else:
+            status = f"(budget {budget_ms} ms) ✗ OVER BUDGET"
+            over_budget.append(module)
+        print(f"\n{module}: {measured['total_ms']:.0f} ms {status}")
+        for entry in measured['imports'][:args.top]:
+            print(f"   {entry['cumulative_ms']:8.1f} ms  {entry['name']}")
+
+        report['modules'][module] = {
+            'budget_ms': budget_ms,
+            'installed': True,
+            'total_ms': measured['total_ms'],
+            'top_imports': measured['imports'][:args.top]
+        }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to '{args.output}'")
+
+    print("\n" + "=" * 70)
+    if over_budget:
+        print(f"✗ Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("✓ All measured imports are within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Tests for the precomputed cohort statistics and percentile lookups.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import cohort_stats
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'Depression Student Dataset.csv')
+
+
+def write_sample(path, n_rows, seed=0):
+    df = pd.read_csv(DATA_PATH).sample(n_rows, random_state=seed)
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_means_match_dataset_on_app_scale(tmp_path):
+    df = pd.read_csv(DATA_PATH)
+    stats = cohort_stats.get_cohort_stats(DATA_PATH, str(tmp_path / 'stats.json'))
+    assert stats.mean('academic_pressure') == pytest.approx(df['Academic Pressure'].mean())
+    assert stats.mean('age') == pytest.approx(df['Age'].mean())
+    sleep_app_scale = df['Sleep Duration'].map({
+        'Less than 5 hours': 1, '5-6 hours': 2, '7-8 hours': 4, 'More than 8 hours': 5
+    })
+    assert stats.mean('sleep_quality') == pytest.approx(sleep_app_scale.mean())
+    assert set(stats.sorted_values['diet_quality']) <= {1, 3, 5}
+
+
+def test_percentile_counts_ties_as_half():
+    stats = cohort_stats.CohortStats({'age': np.array([18, 20, 20, 22.0])}, 'hash')
+    assert stats.percentile('age', 17) == 0
+    assert stats.percentile('age', 20) == 50
+    assert stats.percentile('age', 21) == 75
+    assert stats.percentile('age', 30) == 100
+
+
+def test_rebuilds_when_dataset_changes(tmp_path):
+    csv_path = str(tmp_path / 'data.csv')
+    stats_path = str(tmp_path / 'stats.json')
+    write_sample(csv_path, 100, seed=0)
+    first = cohort_stats.get_cohort_stats(csv_path, stats_path)
+    assert cohort_stats.get_cohort_stats(csv_path, stats_path) is first
+
+    df = write_sample(csv_path, 50, seed=1)
+    second = cohort_stats.get_cohort_stats(csv_path, stats_path)
+    assert second.dataset_sha256 != first.dataset_sha256
+    assert len(second.sorted_values['age']) == 50
+    assert second.mean('study_hours') == pytest.approx(df['Study Hours'].mean())
+
+    # A fresh process reads the stored statistics instead of the CSV
+    cohort_stats._cache.clear()
+    loaded = cohort_stats.get_cohort_stats(csv_path, stats_path)
+    assert loaded.dataset_sha256 == second.dataset_sha256
+    np.testing.assert_array_equal(loaded.sorted_values['age'], second.sorted_values['age'])
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
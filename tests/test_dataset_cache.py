@@ -0,0 +1,84 @@
+"""
+Tests for the columnar dataset cache in dataset.py.
+"""
+
+import sys
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import dataset
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'Depression Student Dataset.csv')
+
+
+def entries(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if os.path.isdir(os.path.join(cache_dir, name)))
+
+
+def test_cached_load_matches_csv(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    columns = dataset.load_dataset_columns(DATA_PATH, cache_dir)
+    df = pd.DataFrame(dataset.load_dataset_columns(DATA_PATH, cache_dir), copy=False)
+
+    pd.testing.assert_frame_equal(df, dataset.load_encoded_dataset(DATA_PATH, cache=False))
+    assert not columns['Age'].flags.writeable
+    assert len(entries(cache_dir)) == 1
+
+
+def test_second_load_skips_csv(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    dataset.load_dataset_columns(DATA_PATH, cache_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('CSV parsed again')
+
+    monkeypatch.setattr(pd, 'read_csv', fail)
+    monkeypatch.setattr(dataset, 'file_sha256', fail)
+    assert len(dataset.load_dataset_columns(DATA_PATH, cache_dir)['Depression']) == 502
+
+
+def test_changed_csv_replaces_entry(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    path = str(tmp_path / 'data.csv')
+    shutil.copy(DATA_PATH, path)
+    first = dataset.load_dataset_columns(path, cache_dir)
+    old_entries = entries(cache_dir)
+
+    df = pd.read_csv(path).head(100)
+    df.to_csv(path, index=False)
+    second = dataset.load_dataset_columns(path, cache_dir)
+
+    assert len(first['Age']) == 502 and len(second['Age']) == 100
+    assert len(entries(cache_dir)) == 1
+    assert entries(cache_dir) != old_entries
+
+
+def test_key_depends_on_encodings():
+    encodings = {column: dict(mapping) for column, mapping in dataset.ENCODINGS.items()}
+    encodings['Gender'] = {'Male': 1, 'Female': 0}
+    assert dataset.dataset_cache_key('abc') == dataset.dataset_cache_key('abc')
+    assert dataset.dataset_cache_key('abc', encodings) != dataset.dataset_cache_key('abc')
+    assert dataset.dataset_cache_key('abd') != dataset.dataset_cache_key('abc')
+
+
+
+def test_only_default_dataset_is_cached(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    monkeypatch.setattr(dataset, 'DEFAULT_CACHE_DIR', cache_dir)
+    path = str(tmp_path / 'data.csv')
+    shutil.copy(DATA_PATH, path)
+
+    assert len(dataset.load_encoded_dataset(path)) == 502
+    assert not os.path.exists(cache_dir)
+    assert len(dataset.load_encoded_dataset(path, cache=True)) == 502
+    assert len(entries(cache_dir)) == 1
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,194 @@
+"""
+Equivalence tests for the NumPy forest engine against sklearn's predict_proba.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import model_utils
+from forest_engine import CompiledForest, CompactForest, _round_down_float32
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'Depression Student Dataset.csv')
+TARGETS = ['Depression', 'Have you ever had suicidal thoughts ?']
+
+
+def load_dataset():
+    df = pd.read_csv(DATA_PATH)
+    X = model_utils.encode_batch(df)
+    y = pd.DataFrame({
+        target: df[target].map(model_utils.ENCODINGS[target]) for target in TARGETS
+    })
+    return X, y
+
+
+def random_inputs(n_rows, seed=0):
+    # Covers values on and between the training thresholds, plus out-of-range ones
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Gender': rng.integers(0, 2, n_rows),
+        'Age': rng.integers(14, 40, n_rows),
+        'Academic Pressure': rng.uniform(0, 6, n_rows),
+        'Study Satisfaction': rng.integers(1, 6, n_rows).astype(float),
+        'Sleep Duration': rng.integers(1, 6, n_rows),
+        'Dietary Habits': rng.integers(1, 4, n_rows),
+        'Study Hours': rng.integers(0, 25, n_rows),
+        'Financial Stress': rng.uniform(1, 5, n_rows),
+        'Family History of Mental Illness': rng.integers(0, 2, n_rows)
+    }, columns=model_utils.FEATURE_COLUMNS)
+
+
+def with_missing(X, fraction=0.2, seed=0):
+    # A missing answer is encoded as NaN (encode_row maps None to NaN)
+    X = pd.DataFrame(X, columns=model_utils.FEATURE_COLUMNS, dtype=np.float64)
+    return X.mask(np.random.default_rng(seed).random(X.shape) < fraction)
+
+
+def assert_equivalent(forest, X):
+    compiled = CompiledForest.from_sklearn(forest)
+    expected = forest.predict_proba(X)
+    actual = compiled.predict_proba(X)
+
+    if isinstance(expected, list):
+        for expected_k, actual_k in zip(expected, actual):
+            np.testing.assert_array_equal(actual_k, expected_k)
+    else:
+        np.testing.assert_array_equal(actual, expected)
+    np.testing.assert_array_equal(compiled.predict(X), forest.predict(X))
+
+
+@pytest.mark.parametrize('target', TARGETS)
+def test_matches_sklearn_on_dataset(target):
+    X, y = load_dataset()
+    forest = RandomForestClassifier(n_estimators=50, random_state=42).fit(X, y[target])
+    assert_equivalent(forest, X)
+    assert_equivalent(forest, random_inputs(500))
+    assert_equivalent(forest, with_missing(random_inputs(500)))
+
+
+def test_matches_sklearn_multi_output():
+    X, y = load_dataset()
+    forest = RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+    assert_equivalent(forest, random_inputs(200))
+    assert_equivalent(forest, with_missing(random_inputs(200)))
+
+
+def test_missing_values_seen_in_training():
+    # Splits fitted on NaN rows send them to the side sklearn learned
+    X, y = load_dataset()
+    X_missing = with_missing(X, fraction=0.3, seed=5)
+    forest = RandomForestClassifier(n_estimators=30, random_state=5).fit(X_missing, y[TARGETS[1]])
+    assert CompiledForest.from_sklearn(forest).missing_go_to_left.any()
+    assert_equivalent(forest, with_missing(random_inputs(500), seed=6))
+
+
+def test_small_batch_size_gives_same_result():
+    X, y = load_dataset()
+    forest = RandomForestClassifier(n_estimators=20, random_state=1).fit(X, y[TARGETS[0]])
+    compiled = CompiledForest.from_sklearn(forest)
+    full = compiled.predict_proba(X)
+    compiled.batch_size = 7
+    np.testing.assert_array_equal(compiled.predict_proba(X), full)
+
+
+
+def test_float32_thresholds_take_the_same_branch():
+    rng = np.random.default_rng(3)
+    threshold = rng.uniform(-10, 10, 2000)
+    threshold32 = _round_down_float32(threshold)
+    assert threshold32.dtype == np.float32
+    below = np.nextafter(threshold.astype(np.float32), np.float32(-np.inf))
+    above = np.nextafter(threshold.astype(np.float32), np.float32(np.inf))
+    for x in [below, threshold.astype(np.float32), above]:
+        np.testing.assert_array_equal(x <= threshold32, x.astype(np.float64) <= threshold)
+
+
+@pytest.mark.parametrize('leaf_bits', [8, 16])
+@pytest.mark.parametrize('multi_output', [False, True])
+def test_compact_forest_stays_within_quantization_step(leaf_bits, multi_output):
+    X, y = load_dataset()
+    target = y if multi_output else y[TARGETS[0]]
+    forest = RandomForestClassifier(n_estimators=30, min_samples_leaf=3, random_state=2).fit(X.to_numpy(), target)
+    compiled = CompiledForest.from_sklearn(forest)
+    compact = CompactForest.from_compiled(compiled, leaf_bits=leaf_bits)
+    assert len(compact.feature) < len(compiled.feature)
+
+    inputs = np.concatenate([X.to_numpy(), random_inputs(500).to_numpy(), with_missing(random_inputs(500)).to_numpy()])
+    expected, actual = compiled.predict_proba(inputs), compact.predict_proba(inputs)
+    if not multi_output:
+        expected, actual = [expected], [actual]
+    for expected_k, actual_k in zip(expected, actual):
+        assert np.abs(actual_k - expected_k).max() <= 0.5 / compact.value_scale + 1e-12
+
+
+def test_compiled_forest_save_and_load(tmp_path):
+    X, y = load_dataset()
+    X_missing = with_missing(X, fraction=0.3, seed=9).to_numpy()
+    forest = RandomForestClassifier(n_estimators=10, random_state=9).fit(X_missing, y[TARGETS[0]])
+    directory = str(tmp_path / 'model.forest')
+    CompiledForest.from_sklearn(forest).save(directory, source_sha256='abc')
+
+    loaded = CompiledForest.load(directory)
+    assert loaded.metadata['format'] == 'forest-v2'
+    inputs = with_missing(random_inputs(300), seed=10).to_numpy()
+    np.testing.assert_array_equal(loaded.predict_proba(inputs), forest.predict_proba(inputs))
+
+    # Artifacts without missing_go_to_left are not read
+    header_path = os.path.join(directory, 'header.json')
+    with open(header_path) as f:
+        header = json.load(f)
+    with open(header_path, 'w') as f:
+        json.dump(dict(header, format='forest-v1'), f)
+    with pytest.raises(ValueError, match='forest-v1'):
+        CompiledForest.load(directory)
+
+
+def test_compact_forest_keeps_missing_value_routing():
+    # Trees fitted on NaN rows; splits that only differ in where NaN goes
+    # must not be merged
+    X, y = load_dataset()
+    X_missing = with_missing(X, fraction=0.3, seed=11).to_numpy()
+    forest = RandomForestClassifier(n_estimators=20, random_state=11).fit(X_missing, y[TARGETS[1]])
+    compiled = CompiledForest.from_sklearn(forest)
+    compact = CompactForest.from_compiled(compiled)
+    assert compact.missing_go_to_left.any()
+
+    inputs = with_missing(random_inputs(1000), seed=12).to_numpy()
+    assert np.abs(compact.predict_proba(inputs) - compiled.predict_proba(inputs)).max() <= 0.5 / compact.value_scale + 1e-12
+
+
+def test_compact_forest_save_and_load(tmp_path):
+    X, y = load_dataset()
+    forest = RandomForestClassifier(n_estimators=10, random_state=4).fit(X.to_numpy(), y[TARGETS[1]])
+    compact = CompactForest.from_compiled(CompiledForest.from_sklearn(forest))
+    compact.save(str(tmp_path / 'model.compact'), source_sha256='abc')
+
+    loaded = CompactForest.load(str(tmp_path / 'model.compact'))
+    assert loaded.metadata['format'] == 'forest-compact-v2'
+    assert [loaded.feature.dtype, loaded.threshold.dtype, loaded.left.dtype, loaded.value.dtype] == \
+        [np.uint8, np.float32, np.uint32, np.uint16]
+    np.testing.assert_array_equal(loaded.predict_proba(X.to_numpy()), compact.predict_proba(X.to_numpy()))
+    with pytest.raises(ValueError):
+        CompiledForest.load(str(tmp_path / 'model.compact'))
+
+@pytest.mark.parametrize('model_name', ['depression_model', 'suicidal_model'])
+def test_matches_trained_models(model_name):
+    if not os.path.exists(os.path.join(ML_DIR, f'{model_name}.pkl')):
+        pytest.skip('trained models not found, run train_all_models.py first')
+    forest = model_utils.load_models(engine='sklearn')[model_name]
+    assert list(forest.feature_names_in_) == model_utils.FEATURE_COLUMNS
+    assert_equivalent(forest, random_inputs(300, seed=7))
+    assert_equivalent(forest, with_missing(random_inputs(300, seed=8)))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
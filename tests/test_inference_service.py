@@ -0,0 +1,186 @@
+"""
+Tests for the micro-batching inference service and its client.
+A fake predict_batch is used, so the trained models are not needed.
+"""
+
+import sys
+import os
+import asyncio
+import contextlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import inference_service
+import model_utils
+import prefork_server
+from inference_client import InferenceClient
+
+SAMPLE_INPUT = dict(
+    gender="Female", age=22, academic_pressure=3, study_satisfaction=4,
+    sleep_duration="7-8 hours", dietary_habits="Healthy", study_hours=6,
+    financial_stress=2, family_history="No"
+)
+
+
+class FakePredictor:
+    """Scores a row by its age and records the size of every batch."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, columns):
+        ages = np.asarray(columns['age'], dtype=float)
+        self.batch_sizes.append(len(ages))
+        return {
+            'depression_prediction': (ages > 25).astype(int),
+            'depression_probability': ages / 100,
+            'suicidal_prediction': np.zeros(len(ages), dtype=int),
+            'suicidal_probability': ages / 200
+        }
+
+
+def test_concurrent_requests_share_batches():
+    predictor = FakePredictor()
+
+    async def run():
+        batcher = inference_service.MicroBatcher(max_batch_size=8, max_wait_ms=50, predict_fn=predictor)
+        batcher.start()
+        results = await asyncio.gather(*[
+            batcher.submit(dict(SAMPLE_INPUT, age=age)) for age in range(18, 38)
+        ])
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert predictor.batch_sizes == [8, 8, 4]
+    assert [result['depression_probability'] for result in results] == [age / 100 for age in range(18, 38)]
+    assert [result['depression_prediction'] for result in results] == [int(age > 25) for age in range(18, 38)]
+
+
+def test_parse_rejects_incomplete_requests():
+    with pytest.raises(ValueError, match='Missing fields: age'):
+        inference_service.parse_prediction_request(
+            b'{"gender": "Male", "academic_pressure": 3, "study_satisfaction": 3, '
+            b'"sleep_duration": 3, "dietary_habits": 2, "study_hours": 5, '
+            b'"financial_stress": 3, "family_history": "No"}'
+        )
+    with pytest.raises(ValueError, match='Invalid JSON'):
+        inference_service.parse_prediction_request(b'{')
+
+
+@contextlib.contextmanager
+def running_service(predictor, max_wait_ms=1):
+    """Serve predictor on a free local port in a background thread."""
+    ready = threading.Event()
+    state = {}
+
+    async def run_server():
+        batcher = inference_service.MicroBatcher(max_wait_ms=max_wait_ms, predict_fn=predictor)
+        batcher.start()
+        server = await asyncio.start_server(
+            lambda reader, writer: inference_service.handle_connection(reader, writer, batcher, {}),
+            '127.0.0.1', 0
+        )
+        state['port'] = server.sockets[0].getsockname()[1]
+        state['loop'] = asyncio.get_running_loop()
+        state['stop'] = asyncio.Event()
+        ready.set()
+        async with server:
+            await state['stop'].wait()
+        await batcher.stop()
+
+    thread = threading.Thread(target=asyncio.run, args=(run_server(),))
+    thread.start()
+    ready.wait(5)
+    try:
+        yield InferenceClient(f"http://127.0.0.1:{state['port']}")
+    finally:
+        state['loop'].call_soon_threadsafe(state['stop'].set)
+        thread.join(5)
+
+
+def test_client_round_trip():
+    predictor = FakePredictor()
+    with running_service(predictor) as client:
+        result = client.predict_both(**SAMPLE_INPUT)
+        assert result == {
+            'depression_prediction': 0, 'depression_probability': 0.22,
+            'suicidal_prediction': 0, 'suicidal_probability': 0.11
+        }
+        assert client.health()['rows'] == 1
+        with pytest.raises(RuntimeError, match='404'):
+            client._request('/unknown')
+
+
+def test_bad_request_does_not_fail_its_batch():
+    predictor = FakePredictor()
+    with running_service(predictor, max_wait_ms=200) as client:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            good = pool.submit(client.predict_both, **SAMPLE_INPUT)
+            bad = pool.submit(client.predict_both, **dict(SAMPLE_INPUT, age='abc'))
+            assert good.result()['depression_probability'] == 0.22
+            with pytest.raises(RuntimeError, match="400.*'age' must be a number"):
+                bad.result()
+    assert predictor.batch_sizes == [1]
+
+
+class EncodingPredictor(FakePredictor):
+    """FakePredictor that encodes the batch first and, like sklearn, rejects non-finite input."""
+
+    def __call__(self, columns):
+        if not np.isfinite(model_utils.encode_batch(columns).to_numpy(dtype=float)).all():
+            raise ValueError('Input X contains infinity or NaN')
+        return super().__call__(columns)
+
+
+def test_non_finite_request_does_not_fail_its_batch():
+    predictor = EncodingPredictor()
+    with running_service(predictor, max_wait_ms=200) as client:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            good = [pool.submit(client.predict_both, **dict(SAMPLE_INPUT, age=age)) for age in (20, 21, 22)]
+            # json.dumps writes the float as the non-standard constant Infinity
+            bad = pool.submit(client.predict_both, **dict(SAMPLE_INPUT, gender=float('inf')))
+            assert [future.result()['depression_probability'] for future in good] == [0.2, 0.21, 0.22]
+            with pytest.raises(RuntimeError, match='400.*Infinity is not allowed'):
+                bad.result()
+    assert predictor.batch_sizes == [3]
+
+
+def test_parse_coerces_numeric_fields():
+    row = inference_service.parse_prediction_request(
+        json.dumps(dict(SAMPLE_INPUT, age='22', study_hours=6)).encode()
+    )
+    assert row['age'] == 22.0 and row['study_hours'] == 6.0
+    assert row['gender'] == 'Female'
+    for bad_value in [None, 'abc', 'nan', [3], True]:
+        with pytest.raises(ValueError, match='financial_stress'):
+            inference_service.parse_prediction_request(
+                json.dumps(dict(SAMPLE_INPUT, financial_stress=bad_value)).encode()
+            )
+    for body in [b'NaN', b'-Infinity', b'1e400']:
+        with pytest.raises(ValueError):
+            inference_service.parse_prediction_request(
+                json.dumps(dict(SAMPLE_INPUT, family_history=0)).encode().replace(b'"family_history": 0', b'"family_history": ' + body)
+            )
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'), reason='needs /proc/<pid>/smaps_rollup')
+def test_memory_report_splits_shared_and_private():
+    rows = prefork_server.memory_report(os.getpid(), [])
+    assert [row['role'] for row in rows] == ['parent']
+    row = rows[0]
+    assert row['rss_mb'] > 0
+    assert row['shared_mb'] + row['private_mb'] == pytest.approx(row['rss_mb'], abs=0.01)
+    assert prefork_server.memory_report(os.getpid(), [2 ** 22 + 1])[1:] == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,70 @@
+"""
+Tests for the precomputed risk lookup table.
+"""
+
+import sys
+import os
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import model_utils
+from forest_engine import CompiledForest
+from lookup_table import LOOKUP_AXES, RiskLookupTable, axis_values, build_table, score_grid
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'Depression Student Dataset.csv')
+TARGETS = ['Depression', 'Have you ever had suicidal thoughts ?']
+
+# Smaller ranges for Age and Study Hours keep the grid quick to score
+AXES = [(name, low, min(high, low + 4)) for name, low, high in LOOKUP_AXES]
+
+# Band edges used by the web apps, compared with both > and >=
+THRESHOLDS = [0.35, 0.5, 0.65]
+
+
+@pytest.fixture(scope='module')
+def forests():
+    df = pd.read_csv(DATA_PATH)
+    X = model_utils.encode_batch(df).to_numpy()
+    # Leaves with several samples give probabilities between the band edges
+    return [
+        CompiledForest.from_sklearn(
+            RandomForestClassifier(n_estimators=40, min_samples_leaf=4, random_state=seed)
+            .fit(X, df[target].map(model_utils.ENCODINGS[target]))
+        )
+        for seed, target in enumerate(TARGETS)
+    ]
+
+
+def test_table_bands_match_score_grid(forests, tmp_path):
+    build_table(forests[0], forests[1], 'test-version', str(tmp_path), axes=AXES)
+    table = RiskLookupTable.load(str(tmp_path), 'test-version')
+
+    cells = np.array(list(itertools.product(*axis_values(AXES))))
+    in_range, probabilities = table.lookup(cells)
+    assert in_range.all()
+
+    for column, forest in enumerate(forests):
+        expected = score_grid(forest, AXES)[..., 1].ravel()
+        actual = probabilities[:, column]
+        for threshold in THRESHOLDS:
+            np.testing.assert_array_equal(actual > threshold, expected > threshold)
+            np.testing.assert_array_equal(actual >= threshold, expected >= threshold)
+        # Same values as the forest itself
+        np.testing.assert_array_equal(actual, forest.predict_proba(cells)[:, 1])
+
+
+def test_table_from_other_version_is_ignored(forests, tmp_path):
+    build_table(forests[0], forests[1], 'test-version', str(tmp_path), axes=AXES)
+    assert RiskLookupTable.load(str(tmp_path), 'other-version') is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
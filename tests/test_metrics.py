@@ -0,0 +1,80 @@
+"""
+Tests for the stage timers, counters and Prometheus export in metrics.py.
+"""
+
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    was_enabled = metrics.is_enabled()
+    metrics.reset()
+    yield
+    metrics.reset()
+    (metrics.enable if was_enabled else metrics.disable)()
+
+
+def test_disabled_records_nothing():
+    metrics.disable()
+    with metrics.timed('preprocess'):
+        pass
+    metrics.increment('predictions', source='cache')
+    assert metrics.snapshot() == {'stages': {}, 'counters': {}}
+    assert metrics.export_prometheus() == ''
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics.enable()
+    for seconds in [0.0001, 0.003, 0.003, 20.0]:
+        metrics.observe('inference', seconds)
+    stage = metrics.snapshot()['stages']['inference']
+    buckets = dict(stage['buckets'])
+    assert stage['count'] == 4
+    assert stage['sum_seconds'] == pytest.approx(20.0061)
+    assert buckets[0.0005] == 1
+    assert buckets[0.005] == 3
+    assert buckets[10.0] == 3
+    assert buckets[float('inf')] == 4
+
+
+def test_prometheus_export_and_dump(tmp_path):
+    metrics.enable()
+    with metrics.timed('load_models'):
+        pass
+    metrics.increment('predictions', 3, source='lookup')
+    metrics.increment('predictions', source='lookup')
+
+    text = metrics.export_prometheus()
+    assert '# TYPE depression_analyzer_stage_seconds histogram' in text
+    assert 'depression_analyzer_stage_seconds_bucket{stage="load_models",le="+Inf"} 1' in text
+    assert 'depression_analyzer_stage_seconds_count{stage="load_models"} 1' in text
+    assert 'depression_analyzer_predictions_total{source="lookup"} 4' in text
+
+    path = metrics.dump(str(tmp_path / 'metrics.prom'))
+    with open(path) as f:
+        assert f.read() == text
+
+
+
+def test_concurrent_dumps(tmp_path):
+    metrics.enable()
+    metrics.increment('predictions', source='forest')
+    path = str(tmp_path / 'metrics.prom')
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(metrics.dump, [path] * 200)) == [path] * 200
+    with open(path) as f:
+        assert f.read() == metrics.export_prometheus()
+    assert os.listdir(tmp_path) == ['metrics.prom']
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,111 @@
+"""
+Tests for the DataFrame-free preprocessing path (model_utils.encode_row).
+"""
+
+import sys
+import os
+import warnings
+
+import numpy as np
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import model_utils
+
+requires_models = pytest.mark.skipif(
+    not os.path.exists(os.path.join(ML_DIR, 'depression_model.pkl')),
+    reason='trained models not found, run train_all_models.py first'
+)
+
+
+def sample_answers(n_rows, seed=0):
+    # Text answers (with the short aliases and unknown text), encoded values,
+    # in-range and fractional numbers
+    rng = np.random.default_rng(seed)
+    choices = {
+        'gender': ['Male', 'Female', 'Other', 0, 1],
+        'sleep_duration': list(model_utils.SLEEP_DURATION_MAP) + ['Unknown', 1, 4],
+        'dietary_habits': ['Unhealthy', 'Moderate', 'Healthy', 'Vegan', 2],
+        'family_history': ['Yes', 'No', 'Maybe', 1]
+    }
+    for _ in range(n_rows):
+        answers = {name: values[rng.integers(len(values))] for name, values in choices.items()}
+        answers.update(
+            age=int(rng.integers(18, 35)),
+            academic_pressure=float(rng.choice([1, 2, 3, 4, 5, 2.5, 3.3])),
+            study_satisfaction=int(rng.integers(1, 6)),
+            study_hours=int(rng.integers(0, 13)),
+            financial_stress=float(rng.choice([1, 3, 5, 4.7]))
+        )
+        yield answers
+
+
+def test_encode_row_matches_preprocess_input():
+    for answers in sample_answers(500):
+        expected = model_utils.preprocess_input(**answers)[model_utils.FEATURE_COLUMNS]
+        np.testing.assert_array_equal(
+            model_utils.encode_row(**answers), expected.to_numpy(dtype=np.float32)[0]
+        )
+
+
+def test_encode_row_fills_batch_buffer():
+    rows = list(sample_answers(50, seed=1))
+    buffer = np.empty((len(rows), len(model_utils.FEATURE_COLUMNS)), dtype=np.float32)
+    for i, answers in enumerate(rows):
+        assert model_utils.encode_row(**answers, out=buffer[i]) is not None
+
+    columns = {name: [answers[name] for answers in rows] for name in model_utils.INPUT_COLUMNS}
+    np.testing.assert_array_equal(buffer, model_utils.encode_batch(columns).to_numpy(dtype=np.float32))
+
+
+@pytest.mark.parametrize('name', ['age', 'study_hours', 'academic_pressure'])
+@pytest.mark.parametrize('bad_value', [None, float('nan'), 'abc'])
+def test_encode_batch_rejects_missing_numbers(name, bad_value):
+    rows = list(sample_answers(2, seed=2))
+    columns = {key: [answers[key] for answers in rows] for key in model_utils.INPUT_COLUMNS}
+    columns[name][1] = bad_value
+    with pytest.raises(ValueError):
+        model_utils.encode_batch(columns)
+
+
+@requires_models
+@pytest.mark.parametrize('engine', ['sklearn', 'compiled'])
+def test_predict_both_matches_dataframe_path(engine):
+    models = model_utils.load_models(engine=engine)
+    model_utils.clear_prediction_cache()
+    try:
+        with warnings.catch_warnings():
+            # No feature name warnings from sklearn for array input
+            warnings.simplefilter('error')
+            for answers in sample_answers(40, seed=2):
+                result = model_utils.predict_both(**answers)
+                expected = model_utils._predict_encoded(models, model_utils.preprocess_input(**answers))
+                for key, values in expected.items():
+                    assert result[key] == values[0], (key, answers)
+                # The loaded models keep sklearn's column check for DataFrames
+                frame = model_utils.preprocess_input(**answers)[model_utils.FEATURE_COLUMNS]
+                assert models['depression_model'].predict_proba(frame)[0, 1] == result['depression_probability']
+    finally:
+        model_utils.load_models(engine=model_utils.DEFAULT_ENGINE)
+
+
+
+@requires_models
+def test_missing_answers_are_not_cached():
+    model_utils.load_models()
+    model_utils.clear_prediction_cache()
+    answers = next(sample_answers(1, seed=3))
+    results = [model_utils.predict_both(**dict(answers, sleep_duration=None)) for _ in range(3)]
+    assert results[0] == results[1] == results[2]
+    assert model_utils.get_prediction_cache_stats()['size'] == 0
+
+    for _ in range(3):
+        model_utils.predict_both(**answers)
+    stats = model_utils.get_prediction_cache_stats()
+    assert (stats['size'], stats['hits']) == (1, 2)
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,70 @@
+"""
+Tests for the streaming bulk-scoring CLI.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+import model_utils
+import score_csv
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'Depression Student Dataset.csv')
+
+requires_models = pytest.mark.skipif(
+    not os.path.exists(os.path.join(ML_DIR, 'depression_model.pkl')),
+    reason='trained models not found, run train_all_models.py first'
+)
+
+
+def test_risk_bands_match_app_thresholds():
+    depression, suicidal = score_csv.risk_bands(
+        np.array([0.2, 0.35, 0.36, 0.65, 0.66]),
+        np.array([0.5, 0.51, 0.0, 1.0, 0.2])
+    )
+    assert depression.tolist() == ['Low', 'Low', 'Moderate', 'Moderate', 'High']
+    assert suicidal.tolist() == ['Low', 'Detected', 'Low', 'Detected', 'Low']
+
+
+def test_missing_column_is_reported():
+    columns = [name for name in model_utils.INPUT_COLUMNS if name != 'study_hours']
+    with pytest.raises(KeyError, match='study_hours'):
+        score_csv.input_columns(columns)
+
+
+@requires_models
+def test_chunked_output_matches_predict_batch(tmp_path):
+    df = pd.read_csv(DATA_PATH)
+    df.loc[3, 'Study Hours'] = np.nan
+    df['Age'] = df['Age'].astype(object)
+    df.loc[5, 'Age'] = 'twenty'
+    input_path = tmp_path / 'responses.csv'
+    output_path = tmp_path / 'scored.csv'
+    df.to_csv(input_path, index=False)
+
+    totals = score_csv.score_csv(str(input_path), str(output_path), chunk_size=64, workers=0)
+    assert totals == {'rows': len(df), 'invalid_rows': 2, 'chunks': int(np.ceil(len(df) / 64))}
+
+    scored = pd.read_csv(output_path)
+    assert list(scored.columns) == list(df.columns) + score_csv.RESULT_COLUMNS
+    assert scored.loc[5, 'Age'] == 'twenty'
+    for row in [3, 5]:
+        assert scored.loc[row, 'depression_risk'] == 'Invalid'
+        assert np.isnan(scored.loc[row, 'depression_probability'])
+
+    valid = df.drop(index=[3, 5])
+    expected = model_utils.predict_batch(valid)
+    scored = scored.drop(index=[3, 5])
+    np.testing.assert_allclose(scored['depression_probability'], expected['depression_probability'])
+    np.testing.assert_array_equal(scored['suicidal_prediction'], expected['suicidal_prediction'])
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
@@ -0,0 +1,68 @@
+"""
+Tests for the incremental training helpers in training.py.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+from dataset import iter_encoded_chunks, load_encoded_dataset, features_and_target
+from training import grow_forest, chunk_test_mask
+from refresh_models import refresh_forest
+
+
+def test_grow_forest_keeps_existing_trees():
+    X, y = features_and_target(load_encoded_dataset(), 'depression')
+    model = grow_forest(None, X[:250], y[:250], 5)
+    first_trees = list(model.estimators_)
+
+    grown = grow_forest(model, X[250:], y[250:], 3)
+    assert grown is model
+    assert len(grown.estimators_) == 8
+    assert grown.estimators_[:5] == first_trees
+    assert not grown.warm_start
+    assert grown.predict_proba(X).shape == (len(X), 2)
+
+
+def test_chunks_cover_the_dataset():
+    full = load_encoded_dataset()
+    chunks = list(iter_encoded_chunks(chunk_size=100))
+    assert [len(chunk) for chunk in chunks] == [100, 100, 100, 100, 100, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+
+
+def test_chunk_test_mask_is_deterministic():
+    mask = chunk_test_mask(3, 10000)
+    np.testing.assert_array_equal(mask, chunk_test_mask(3, 10000))
+    assert not np.array_equal(mask, chunk_test_mask(4, 10000))
+    assert mask.mean() == pytest.approx(0.3, abs=0.02)
+
+
+def test_refresh_replaces_oldest_trees():
+    X, y = features_and_target(load_encoded_dataset(), 'suicidal')
+    model = grow_forest(None, X, y, 10)
+    kept = model.estimators_[4:]
+
+    refreshed = refresh_forest(model, X[:200], y[:200], 4, 'replace-oldest')
+    assert len(refreshed.estimators_) == 10
+    assert refreshed.n_estimators == 10
+    assert refreshed.estimators_[:6] == kept
+    assert len({tree.random_state for tree in refreshed.estimators_}) == 10
+
+    # Refreshing again with the same rows still gives new seeds
+    refreshed = refresh_forest(refreshed, X[:200], y[:200], 4, 'replace-oldest')
+    assert len({tree.random_state for tree in refreshed.estimators_}) == 10
+
+    with pytest.raises(ValueError):
+        refresh_forest(refreshed, X, y, 10, 'replace-oldest')
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))
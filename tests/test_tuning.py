@@ -0,0 +1,73 @@
+"""
+Tests for the cached cross-validated hyperparameter search.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add ml_grace to path
+ML_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'code', 'ml_grace'))
+sys.path.append(ML_DIR)
+
+from dataset import load_encoded_dataset, features_and_target
+from training import fit_forest
+from tree_count_sweep import truncate_forest
+import tune_hyperparameters as tuning
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = features_and_target(load_encoded_dataset(), 'depression')
+    return X.to_numpy(dtype=np.float64), y.to_numpy()
+
+
+def test_prefix_accuracy_matches_truncated_forests(data):
+    X, y = data
+    model = fit_forest(X[:300], y[:300], n_estimators=20, max_depth=6)
+    accuracy = tuning.prefix_accuracy(model, X[300:], y[300:])
+    assert len(accuracy) == 20
+    for n_trees in [1, 7, 20]:
+        expected = np.mean(truncate_forest(model, n_trees).predict(X[300:]) == y[300:])
+        assert accuracy[n_trees - 1] == pytest.approx(expected)
+
+
+def test_folds_are_stratified_and_cached(data, tmp_path):
+    _, y = data
+    folds = tuning.fold_assignment(y, 4, str(tmp_path), ['test', 'depression'])
+    assert sorted(np.unique(folds)) == [0, 1, 2, 3]
+    for fold in range(4):
+        assert abs(y[folds == fold].mean() - y.mean()) < 0.05
+    np.testing.assert_array_equal(tuning.fold_assignment(y, 4, str(tmp_path), ['test', 'depression']), folds)
+
+
+def test_cache_key_follows_training_split(data, tmp_path):
+    X, y = data
+    for n_rows in [400, 300]:
+        key = ['test', 'depression', tuning.training_key(X[:n_rows], y[:n_rows])]
+        assert len(tuning.fold_assignment(y[:n_rows], 4, str(tmp_path), key)) == n_rows
+    assert tuning.training_key(X[:300], y[:300]) == tuning.training_key(X[:300].copy(), y[:300].copy())
+
+
+def test_rerun_only_fits_new_parameters(data, tmp_path):
+    X, y = data
+    key = ['test', 'depression']
+    folds = tuning.fold_assignment(y, 3, str(tmp_path), key)
+    grid = tuning.param_grid([4], [1, 5], ['sqrt'])
+
+    results, n_fitted = tuning.cross_validate(X, y, grid, folds, 10, str(tmp_path), key)
+    assert n_fitted == 6
+    candidates = tuning.summarize(grid, results, [5, 10])
+    assert len(candidates) == 4
+    assert candidates[0]['cv_accuracy'] >= candidates[-1]['cv_accuracy']
+
+    grid = tuning.param_grid([4, 8], [1, 5], ['sqrt'])
+    rerun, n_fitted = tuning.cross_validate(X, y, grid, folds, 10, str(tmp_path), key)
+    assert n_fitted == 6
+    assert rerun[:2] == results
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-v']))